@@ -3,8 +3,15 @@ import psycopg2
 import psycopg2.extras
 import psycopg2.pool
 import os
+import re
+import io
+import csv
 import logging
-from typing import Optional, List, Dict, Any
+import threading
+import weakref
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterable, Iterator
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,106 +20,474 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Matches execute_values-style templates ("... VALUES %s ...")
+_VALUES_TEMPLATE_RE = re.compile(r'\bVALUES\s+%s', re.IGNORECASE)
+
+# Column order expected by bulk_copy_intraday rows
+INTRADAY_COPY_COLUMNS = (
+    'stock_symbol', 'timestamp', 'open_price', 'high_price', 'low_price',
+    'close_price', 'volume', 'interval', 'created_at'
+)
+
+# Chunk size used when stock_prices_intraday is a TimescaleDB hypertable
+HYPERTABLE_CHUNK_INTERVAL = '7 days'
+
+# Monthly partitions pre-created ahead of the current month (native partitioning)
+PARTITION_MONTHS_AHEAD = 2
+
+# Per (stock_symbol, interval, day) rollup of a set of intraday bars; {source} is
+# the bars relation. Backs the price_daily_rollup materialized view and is also
+# applied to raw bars at the partial-day edges of an analytics range, so both
+# sides yield identical columns. `change` is the close-to-close % move from the
+# previous bar of the same day; moves across days are derived from
+# first_close / last_close.
+PRICE_ROLLUP_SELECT = """
+    SELECT stock_symbol, interval, day,
+           COUNT(*) AS bar_count,
+           MIN(LEAST(open_price, high_price, low_price, close_price)) AS min_price,
+           MAX(GREATEST(open_price, high_price, low_price, close_price)) AS max_price,
+           SUM(open_price + high_price + low_price + close_price) AS sum_price,
+           MIN(open_price) AS min_open, MAX(open_price) AS max_open,
+           MIN(close_price) AS min_close, MAX(close_price) AS max_close,
+           MIN(volume) AS min_volume, MAX(volume) AS max_volume, SUM(volume) AS sum_volume,
+           (ARRAY_AGG(close_price ORDER BY timestamp))[1] AS first_close,
+           (ARRAY_AGG(close_price ORDER BY timestamp DESC))[1] AS last_close,
+           COUNT(change) AS change_count, SUM(change) AS change_sum,
+           SUM(change * change) AS change_sumsq,
+           MIN(change) AS change_min, MAX(change) AS change_max
+    FROM (
+        SELECT stock_symbol, interval, timestamp, open_price, high_price, low_price,
+               close_price, volume, date_trunc('day', timestamp) AS day,
+               (close_price - LAG(close_price) OVER w)::float8
+                   / NULLIF(LAG(close_price) OVER w, 0)::float8 * 100 AS change
+        FROM {source} bars
+        WINDOW w AS (PARTITION BY stock_symbol, interval, date_trunc('day', timestamp) ORDER BY timestamp)
+    ) day_bars
+    GROUP BY stock_symbol, interval, day
+"""
+
+# Pool sizing shared by every DatabaseManager user in the process
+POOL_MIN_CONNECTIONS = 2
+POOL_MAX_CONNECTIONS = int(os.getenv('DB_POOL_SIZE', '20'))
+
+# Process-wide manager returned by DatabaseManager.get()
+_INSTANCE: Optional["DatabaseManager"] = None
+_INSTANCE_LOCK = threading.Lock()
+
 class DatabaseManager:
     """Manages PostgreSQL database connections and operations"""
     
     def __init__(self):
         self.connection_pool = None
         # Don't initialize connection pool on import to avoid connection errors
-        # Call init_connection_pool() explicitly when needed
+        # The pool is created on first use (or via init_connection_pool())
+        self._pool_lock = threading.Lock()
+        # ThreadedConnectionPool raises when exhausted; make borrowers wait instead
+        self._pool_slots = threading.BoundedSemaphore(POOL_MAX_CONNECTIONS)
+        # Connection of the transaction() open on the current thread, if any
+        self._local = threading.local()
+        # Server-side prepared statements: name -> statement, and the names
+        # already PREPAREd on each pooled connection (sessions keep them)
+        self._prepared: Dict[str, str] = {}
+        self._prepared_on: "weakref.WeakKeyDictionary[Any, set]" = weakref.WeakKeyDictionary()
+        self._prepared_lock = threading.Lock()
+    
+    @classmethod
+    def get(cls) -> "DatabaseManager":
+        """Return the process-wide DatabaseManager, sharing one connection pool"""
+        global _INSTANCE
+        if _INSTANCE is None:
+            with _INSTANCE_LOCK:
+                if _INSTANCE is None:
+                    _INSTANCE = cls()
+        return _INSTANCE
     
     def init_connection_pool(self):
         """Initialize the database connection pool"""
-        try:
-            # Get database connection parameters from environment variables
-            host = os.getenv('POSTGRES_HOST', 'localhost')
-            port = int(os.getenv('POSTGRES_PORT', '5432'))
-            database = os.getenv('POSTGRES_DB', 'stock_data')
-            user = os.getenv('POSTGRES_USER', 'postgres')
-            password = os.getenv('POSTGRES_PASSWORD', 'postgres')
-            
-            # Create connection pool
-            self.connection_pool = psycopg2.pool.SimpleConnectionPool(
-                minconn=1,
-                maxconn=10,
-                host=host,
-                port=port,
-                database=database,
-                user=user,
-                password=password
-            )
-            
-            logger.info(f"Database connection pool initialized successfully")
+        with self._pool_lock:
+            if self.connection_pool:
+                return
             
-        except Exception as e:
-            logger.error(f"Failed to initialize database connection pool: {e}")
-            raise
+            try:
+                # Get database connection parameters from environment variables
+                host = os.getenv('POSTGRES_HOST', 'localhost')
+                port = int(os.getenv('POSTGRES_PORT', '5432'))
+                database = os.getenv('POSTGRES_DB', 'stock_data')
+                user = os.getenv('POSTGRES_USER', 'postgres')
+                password = os.getenv('POSTGRES_PASSWORD', 'postgres')
+                
+                # Create a thread-safe connection pool
+                self.connection_pool = psycopg2.pool.ThreadedConnectionPool(
+                    minconn=POOL_MIN_CONNECTIONS,
+                    maxconn=POOL_MAX_CONNECTIONS,
+                    host=host,
+                    port=port,
+                    database=database,
+                    user=user,
+                    password=password
+                )
+                
+                logger.info(f"Database connection pool initialized successfully")
+                
+            except Exception as e:
+                logger.error(f"Failed to initialize database connection pool: {e}")
+                raise
     
     def get_connection(self):
-        """Get a connection from the pool"""
-        if self.connection_pool:
+        """Get a connection from the pool, waiting if all connections are in use"""
+        if not self.connection_pool:
+            self.init_connection_pool()
+        
+        self._pool_slots.acquire()
+        try:
             return self.connection_pool.getconn()
-        else:
-            raise Exception("Database connection pool not initialized")
+        except Exception:
+            self._pool_slots.release()
+            raise
     
     def return_connection(self, conn):
         """Return a connection to the pool"""
         if self.connection_pool and conn:
             self.connection_pool.putconn(conn)
+            self._pool_slots.release()
     
-    def execute_query(self, query: str, params: tuple = None, fetch: bool = False, fetch_one: bool = False):
-        """Execute a SQL query"""
-        conn = None
+    @contextmanager
+    def conn(self):
+        """Borrow a pooled connection, committing on success and rolling back on error"""
+        active = getattr(self._local, 'conn', None)
+        if active is not None:
+            # Inside transaction(): share its connection and leave commit/rollback to it
+            if self._local.aborted:
+                raise psycopg2.InternalError("Current transaction was aborted by an earlier statement")
+            try:
+                yield active
+            except Exception:
+                self._local.aborted = True
+                raise
+            return
+        
+        conn = self.get_connection()
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            
-            cursor.execute(query, params)
-            
-            if fetch:
-                result = cursor.fetchall()
-            elif fetch_one:
-                result = cursor.fetchone()
-            else:
-                result = None
-            
+            yield conn
             conn.commit()
-            cursor.close()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.return_connection(conn)
+    
+    @contextmanager
+    def transaction(self, synchronous_commit: bool = True):
+        """
+        Run every statement this thread issues through the manager in one transaction
+        
+        execute_query, execute_many etc. called inside the block reuse the
+        same connection and commit together when the block exits. If any of
+        them fails the whole transaction is rolled back and the block raises,
+        even when the caller caught the original error.
+        
+        Args:
+            synchronous_commit: Pass False for bulk ingest to skip waiting on
+                the WAL flush at commit (SET LOCAL synchronous_commit = OFF)
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            # Nested: join the outer transaction
+            yield self._local.conn
+            return
+        
+        with self.conn() as conn:
+            if not synchronous_commit:
+                with conn.cursor() as cursor:
+                    cursor.execute("SET LOCAL synchronous_commit = OFF")
             
-            return result
+            self._local.conn = conn
+            self._local.aborted = False
+            try:
+                yield conn
+                if self._local.aborted:
+                    raise psycopg2.InternalError("Transaction rolled back after a failed statement")
+            finally:
+                self._local.conn = None
+    
+    def execute_query(self, query: str, params: tuple = None, fetch: bool = False, fetch_one: bool = False,
+                      cursor_factory=None):
+        """
+        Execute a SQL query
+        
+        Rows are returned as RealDictRow by default; pass e.g.
+        psycopg2.extras.NamedTupleCursor (or psycopg2.extensions.cursor for
+        plain tuples) as cursor_factory on hot read paths that don't need dicts.
+        Statements that fetch nothing run on a plain cursor and return the
+        number of rows affected.
+        """
+        if cursor_factory is None and (fetch or fetch_one):
+            cursor_factory = psycopg2.extras.RealDictCursor
+        
+        try:
+            with self.conn() as conn:
+                with conn.cursor(cursor_factory=cursor_factory) as cursor:
+                    cursor.execute(query, params)
+                    
+                    if fetch:
+                        return cursor.fetchall()
+                    elif fetch_one:
+                        return cursor.fetchone()
+                    return cursor.rowcount
             
         except Exception as e:
-            if conn:
-                conn.rollback()
             logger.error(f"Query execution failed: {e}")
             raise
-        finally:
-            if conn:
-                self.return_connection(conn)
     
-    def execute_many(self, query: str, params_list: List[tuple]) -> int:
-        """Execute a query with multiple parameter sets"""
-        conn = None
+    def register_prepared(self, name: str, statement: str):
+        """
+        Register a statement for execute_prepared()
+        
+        Args:
+            name: Prepared statement name (an SQL identifier, unique per process)
+            statement: SQL using $1, $2, ... placeholders; parameter types are inferred
+        """
+        with self._prepared_lock:
+            existing = self._prepared.get(name)
+            if existing is not None and existing != statement:
+                raise ValueError(f"Prepared statement {name} is already registered with different SQL")
+            self._prepared[name] = statement
+    
+    def execute_prepared(self, name: str, params: tuple = (), fetch: bool = False, fetch_one: bool = False,
+                         cursor_factory=None):
+        """
+        Execute a registered statement via EXECUTE, preparing it on first use per connection
+        
+        The server parses and plans the statement once per pooled connection
+        instead of on every call. Fetch semantics and the rowcount returned
+        when nothing is fetched match execute_query.
+        """
+        if cursor_factory is None and (fetch or fetch_one):
+            cursor_factory = psycopg2.extras.RealDictCursor
+        
+        statement = self._prepared[name]
+        
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.executemany(query, params_list)
-            rows_affected = cursor.rowcount
+            with self.conn() as conn:
+                with conn.cursor(cursor_factory=cursor_factory) as cursor:
+                    with self._prepared_lock:
+                        prepared = self._prepared_on.setdefault(conn, set())
+                        needs_prepare = name not in prepared
+                    if needs_prepare:
+                        # PREPARE is session-level and survives a rollback
+                        cursor.execute(f"PREPARE {name} AS {statement}")
+                        with self._prepared_lock:
+                            prepared.add(name)
+                    
+                    if params:
+                        cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+                    else:
+                        cursor.execute(f"EXECUTE {name}")
+                    
+                    if fetch:
+                        return cursor.fetchall()
+                    elif fetch_one:
+                        return cursor.fetchone()
+                    return cursor.rowcount
             
-            conn.commit()
-            cursor.close()
+        except Exception as e:
+            logger.error(f"Prepared statement {name} failed: {e}")
+            raise
+    
+    def execute_server_cursor(self, query: str, params: tuple = None, itersize: int = 10000,
+                              cursor_factory=psycopg2.extras.NamedTupleCursor) -> Iterator[Any]:
+        """
+        Stream the results of a large read through a named server-side cursor
+        
+        Rows are fetched from the server itersize at a time instead of being
+        materialized client-side; the connection is held until the generator
+        is exhausted or closed.
+        
+        Args:
+            query: SELECT statement to run
+            params: Query parameters
+            itersize: Rows fetched per network round trip
+            cursor_factory: Row type for results (named tuples by default)
+        
+        Yields:
+            Result rows
+        """
+        try:
+            with self.conn() as conn:
+                cursor_name = f"server_cursor_{threading.get_ident()}_{id(conn)}"
+                with conn.cursor(name=cursor_name, cursor_factory=cursor_factory) as cursor:
+                    cursor.itersize = itersize
+                    cursor.execute(query, params)
+                    yield from cursor
             
-            return rows_affected
+        except Exception as e:
+            logger.error(f"Server cursor query failed: {e}")
+            raise
+    
+    def execute_many(self, query: str, params_list: List[tuple]) -> int:
+        """
+        Execute a query with multiple parameter sets
+        
+        Queries written as execute_values templates ("INSERT ... VALUES %s")
+        are dispatched to execute_values_batch; anything else falls back to
+        cursor.executemany.
+        """
+        if _VALUES_TEMPLATE_RE.search(query):
+            return self.execute_values_batch(query, params_list)
+        
+        try:
+            with self.conn() as conn:
+                with conn.cursor() as cursor:
+                    cursor.executemany(query, params_list)
+                    return cursor.rowcount
             
         except Exception as e:
-            if conn:
-                conn.rollback()
             logger.error(f"Batch query execution failed: {e}")
             raise
-        finally:
-            if conn:
-                self.return_connection(conn)
+    
+    def execute_values_batch(self, query_template: str, params_list: List[tuple], page_size: int = 1000) -> int:
+        """
+        Execute a multi-row statement via psycopg2.extras.execute_values
+        
+        Rows are sent as one "VALUES (...),(...)" statement per page instead of
+        one round trip per row.
+        
+        Args:
+            query_template: SQL containing a single "VALUES %s" placeholder
+            params_list: Row tuples to substitute into the placeholder
+            page_size: Maximum number of rows per generated statement
+        
+        Returns:
+            Number of rows affected
+        """
+        if not params_list:
+            return 0
+        
+        try:
+            with self.conn() as conn:
+                with conn.cursor() as cursor:
+                    # Paginate here so rowcount can be summed across pages
+                    rows_affected = 0
+                    for start in range(0, len(params_list), page_size):
+                        page = params_list[start:start + page_size]
+                        psycopg2.extras.execute_values(cursor, query_template, page, page_size=page_size)
+                        rows_affected += cursor.rowcount
+                    return rows_affected
+            
+        except Exception as e:
+            logger.error(f"Batch values execution failed: {e}")
+            raise
+    
+    def bulk_copy_intraday(self, rows: Iterable[tuple]) -> Dict[str, int]:
+        """
+        Bulk load intraday price rows via COPY into the stg_intraday staging table
+        
+        Rows are streamed into the UNLOGGED staging table and upserted into
+        stock_prices_intraday in the same transaction: existing
+        (stock_symbol, timestamp, interval) rows are updated (updated_at set
+        to the row's created_at), new ones inserted.
+        
+        Args:
+            rows: Tuples ordered as INTRADAY_COPY_COLUMNS, for any number of symbols
+        
+        Returns:
+            Number of rows inserted or updated, per stock symbol
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        row_count = 0
+        for row in rows:
+            writer.writerow(row)
+            row_count += 1
+        
+        if not row_count:
+            return {}
+        
+        buffer.seek(0)
+        columns = ', '.join(INTRADAY_COPY_COLUMNS)
+        
+        try:
+            with self.conn() as conn:
+                with conn.cursor() as cursor:
+                    # TRUNCATE locks the staging table, serializing concurrent bulk loads
+                    cursor.execute("TRUNCATE stg_intraday")
+                    cursor.copy_expert(f"COPY stg_intraday ({columns}) FROM STDIN WITH (FORMAT CSV)", buffer)
+                    
+                    # Keep one row per key if the batch contains duplicates
+                    cursor.execute("""
+                        DELETE FROM stg_intraday a
+                        USING stg_intraday b
+                        WHERE a.stock_symbol = b.stock_symbol
+                          AND a.timestamp = b.timestamp
+                          AND a.interval = b.interval
+                          AND a.ctid < b.ctid
+                    """)
+                    
+                    cursor.execute(f"""
+                        WITH upserted AS (
+                            INSERT INTO stock_prices_intraday ({columns})
+                            SELECT {columns} FROM stg_intraday
+                            ON CONFLICT (stock_symbol, timestamp, interval) DO UPDATE
+                            SET open_price = EXCLUDED.open_price, high_price = EXCLUDED.high_price,
+                                low_price = EXCLUDED.low_price, close_price = EXCLUDED.close_price,
+                                volume = EXCLUDED.volume, updated_at = EXCLUDED.created_at
+                            RETURNING stock_symbol
+                        )
+                        SELECT stock_symbol, COUNT(*) FROM upserted GROUP BY stock_symbol
+                    """)
+                    rows_affected = dict(cursor.fetchall())
+                    
+                    cursor.execute("TRUNCATE stg_intraday")
+                    return rows_affected
+            
+        except Exception as e:
+            logger.error(f"Bulk COPY of intraday prices failed: {e}")
+            raise
+    
+    def mark_rollup_stale(self, since: datetime):
+        """
+        Record that bars from `since` onward were written after the last rollup refresh
+        
+        Analytics read every day from that one on from the raw table until
+        refresh_price_rollup() folds it into the view. Call it in the same
+        transaction as the write, so the two commit together.
+        """
+        self.execute_query(
+            "UPDATE price_rollup_state SET stale_from = LEAST(stale_from, date_trunc('day', %s::timestamp))",
+            (since,)
+        )
+    
+    def refresh_price_rollup(self, force: bool = False) -> bool:
+        """
+        Recompute price_daily_rollup from stock_prices_intraday
+        
+        Runs CONCURRENTLY so analytics reads are not blocked. Call after
+        batch loads (run_etl_pipeline does when it loaded bars) or on a
+        schedule; until then days written since the last refresh are read
+        from the raw table (see mark_rollup_stale), so results stay exact,
+        just slower. Skipped while nothing was written since the last refresh,
+        unless `force` is set (e.g. after deleting bars, which marks nothing).
+        
+        Returns:
+            True if the view was refreshed
+        """
+        # Clear the stale marker before the refresh starts: loads committing
+        # after this point mark it again, and everything before is in the refresh
+        with self.transaction():
+            state = self.execute_query("SELECT stale_from FROM price_rollup_state FOR UPDATE", fetch_one=True)
+            if not force and state and state['stale_from'] is None:
+                logger.debug("Price daily rollup is current, skipping refresh")
+                return False
+            self.execute_query("UPDATE price_rollup_state SET stale_from = NULL")
+        
+        try:
+            self.execute_query("REFRESH MATERIALIZED VIEW CONCURRENTLY price_daily_rollup")
+            logger.info("Price daily rollup refreshed")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to refresh price daily rollup: {e}")
+            if state and state['stale_from'] is not None:
+                self.mark_rollup_stale(state['stale_from'])
+            raise
     
     def create_tables(self):
         """Create all necessary database tables"""
@@ -135,10 +510,13 @@ class DatabaseManager:
             self.execute_query(stocks_table_sql)
             logger.info("Stocks table created/verified")
             
-            # Create intraday stock prices table 
-            intraday_table_sql = """
+            # Create intraday stock prices table, partitioned by timestamp.
+            # Unique keys on a partitioned table must include the partition
+            # column, hence the composite (id, timestamp) primary key.
+            use_timescale = self._enable_timescaledb()
+            intraday_table_sql = f"""
             CREATE TABLE IF NOT EXISTS stock_prices_intraday (
-                id SERIAL PRIMARY KEY,
+                id SERIAL,
                 stock_symbol VARCHAR(10) NOT NULL,
                 timestamp TIMESTAMP NOT NULL,
                 open_price DECIMAL(10,4) NOT NULL,
@@ -149,13 +527,50 @@ class DatabaseManager:
                 interval VARCHAR(10) NOT NULL DEFAULT '5min',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id, timestamp),
                 FOREIGN KEY (stock_symbol) REFERENCES stocks(symbol) ON DELETE CASCADE
-            );
+            ){'' if use_timescale else ' PARTITION BY RANGE (timestamp)'};
             """
             
-            self.execute_query(intraday_table_sql)
+            if self._table_exists('stock_prices_intraday') and not self._is_partitioned('stock_prices_intraday'):
+                logger.warning("stock_prices_intraday already exists as a flat table; "
+                               "it must be migrated manually to use timestamp partitioning")
+            else:
+                self.execute_query(intraday_table_sql)
+                if use_timescale:
+                    self.execute_query(f"""
+                        SELECT create_hypertable('stock_prices_intraday', 'timestamp',
+                                                 chunk_time_interval => INTERVAL '{HYPERTABLE_CHUNK_INTERVAL}',
+                                                 if_not_exists => TRUE)
+                    """)
+                    logger.info("Stock prices intraday hypertable created/verified")
+                else:
+                    self.execute_query("""
+                        CREATE TABLE IF NOT EXISTS stock_prices_intraday_default
+                        PARTITION OF stock_prices_intraday DEFAULT
+                    """)
+                    self.ensure_intraday_partitions()
             logger.info("Stock prices intraday table created/verified")
             
+            # Create UNLOGGED staging table for COPY-based bulk loads (no indexes, no WAL)
+            staging_table_sql = """
+            CREATE UNLOGGED TABLE IF NOT EXISTS stg_intraday (
+                stock_symbol VARCHAR(10) NOT NULL,
+                timestamp TIMESTAMP NOT NULL,
+                open_price DECIMAL(10,4) NOT NULL,
+                high_price DECIMAL(10,4) NOT NULL,
+                low_price DECIMAL(10,4) NOT NULL,
+                close_price DECIMAL(10,4) NOT NULL,
+                volume BIGINT NOT NULL,
+                interval VARCHAR(10) NOT NULL DEFAULT '5min',
+                created_at TIMESTAMP NOT NULL
+            );
+            ALTER TABLE stg_intraday ADD COLUMN IF NOT EXISTS created_at TIMESTAMP NOT NULL;
+            """
+            
+            self.execute_query(staging_table_sql)
+            logger.info("Intraday staging table created/verified")
+            
             # Create ETL job logs table
             etl_logs_table_sql = """
             CREATE TABLE IF NOT EXISTS etl_job_logs (
@@ -179,40 +594,60 @@ class DatabaseManager:
             
             # Indexes for stocks table
             self.execute_query("""
-                -- Index on symbol for fast stock lookups by symbol (most common query)
-                CREATE INDEX IF NOT EXISTS idx_stock_symbol ON stocks(symbol);
+                -- Lookups by symbol use the index behind its UNIQUE constraint;
+                -- idx_stock_symbol only duplicated it
+                DROP INDEX IF EXISTS idx_stock_symbol;
                 -- Index on exchange for filtering stocks by exchange (e.g., NYSE, NASDAQ)
                 CREATE INDEX IF NOT EXISTS idx_stock_exchange ON stocks(exchange);
             """)
             
             # Indexes for stock_prices_intraday table
             self.execute_query("""
-                -- Composite index for fast queries by stock symbol and timestamp (most common query pattern)
-                -- This enables efficient time-series queries for specific stocks
-                CREATE INDEX IF NOT EXISTS idx_intraday_symbol_timestamp ON stock_prices_intraday(stock_symbol, timestamp);
+                -- One row per bar: the conflict target for ON CONFLICT upserts. Its
+                -- (stock_symbol, timestamp) prefix also serves per-stock time-series queries,
+                -- replacing the former idx_intraday_symbol_timestamp
+                CREATE UNIQUE INDEX IF NOT EXISTS ux_intraday_symbol_timestamp_interval
+                    ON stock_prices_intraday(stock_symbol, timestamp, interval);
+                DROP INDEX IF EXISTS idx_intraday_symbol_timestamp;
                 
-                -- Index on timestamp for global time-based queries across all stocks
-                -- Useful for market-wide analysis and time-range filtering
-                CREATE INDEX IF NOT EXISTS idx_intraday_timestamp ON stock_prices_intraday(timestamp);
+                -- Keyset pagination order for the price endpoints: per-stock pages seek
+                -- (stock_symbol, timestamp, id); global pages seek (timestamp, id) and
+                -- merge partitions in order. The latter replaces idx_intraday_timestamp
+                CREATE INDEX IF NOT EXISTS idx_intraday_symbol_timestamp_id
+                    ON stock_prices_intraday(stock_symbol, timestamp DESC, id DESC);
+                CREATE INDEX IF NOT EXISTS idx_intraday_timestamp_id
+                    ON stock_prices_intraday(timestamp DESC, id DESC);
+                DROP INDEX IF EXISTS idx_intraday_timestamp;
                 
                 -- Index on interval for filtering by time interval (1min, 5min, 15min, etc.)
                 -- Enables efficient queries for specific intraday intervals
                 CREATE INDEX IF NOT EXISTS idx_intraday_interval ON stock_prices_intraday(interval);
                 
-                -- Composite index for queries filtering by both stock and interval
-                -- Optimizes queries like "get all 5min data for AAPL"
-                CREATE INDEX IF NOT EXISTS idx_intraday_symbol_interval ON stock_prices_intraday(stock_symbol, interval);
+                -- Covering index for per-stock, per-interval reads ("all 5min data for AAPL"):
+                -- latest-price seeks, interval-filtered price pages and the rollup's raw
+                -- edge bars. The OHLCV columns are INCLUDEd so the edge bars come from
+                -- index-only scans. Replaces idx_intraday_symbol_interval (its prefix)
+                CREATE INDEX IF NOT EXISTS idx_intraday_symbol_interval_timestamp
+                    ON stock_prices_intraday(stock_symbol, interval, timestamp DESC)
+                    INCLUDE (open_price, high_price, low_price, close_price, volume);
+                DROP INDEX IF EXISTS idx_intraday_symbol_interval;
             """)
             
             # Indexes for etl_job_logs table
             self.execute_query("""
-                -- Index on status for filtering jobs by status (SUCCESS, FAILED, RUNNING)
-                -- Enables quick status-based queries for monitoring and debugging
-                CREATE INDEX IF NOT EXISTS idx_etl_job_status ON etl_job_logs(status);
+                -- Index on (status, start_time, id) for filtering jobs by status (SUCCESS,
+                -- FAILED, RUNNING) in keyset-paginated job history order. Replaces
+                -- idx_etl_job_status (its prefix)
+                CREATE INDEX IF NOT EXISTS idx_etl_job_status_start_time_id ON etl_job_logs(status, start_time, id);
+                DROP INDEX IF EXISTS idx_etl_job_status;
                 
-                -- Index on start_time for time-based job queries and recent job analysis
-                -- Useful for performance monitoring and job history analysis
-                CREATE INDEX IF NOT EXISTS idx_etl_job_start_time ON etl_job_logs(start_time);
+                -- Index on (start_time, id) for time-based job queries and keyset-paginated
+                -- job history (scanned backwards for newest-first pages)
+                CREATE INDEX IF NOT EXISTS idx_etl_job_start_time_id ON etl_job_logs(start_time, id);
+                DROP INDEX IF EXISTS idx_etl_job_start_time;
+                
+                -- Index on created_at for the rolling 7-day status aggregates
+                CREATE INDEX IF NOT EXISTS idx_etl_job_created_at ON etl_job_logs(created_at);
                 
                 -- Index on job_name for filtering specific job types
                 -- Enables analysis of specific ETL job performance over time
@@ -220,23 +655,139 @@ class DatabaseManager:
             """)
             
             logger.info("All database indexes created/verified")
+            
+            # Daily OHLCV rollup for the analytics endpoints; the unique index
+            # allows REFRESH ... CONCURRENTLY (see refresh_price_rollup)
+            self.execute_query(f"""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS price_daily_rollup AS
+                {PRICE_ROLLUP_SELECT.format(source='stock_prices_intraday')};
+                CREATE UNIQUE INDEX IF NOT EXISTS ux_price_daily_rollup
+                    ON price_daily_rollup(stock_symbol, interval, day);
+                CREATE INDEX IF NOT EXISTS idx_price_daily_rollup_interval_day
+                    ON price_daily_rollup(interval, day);
+            """)
+            
+            # Earliest day written since the last rollup refresh (NULL: view is current).
+            # Seeded as -infinity so an existing view is trusted only after a refresh
+            self.execute_query("""
+                CREATE TABLE IF NOT EXISTS price_rollup_state (
+                    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+                    stale_from TIMESTAMP
+                );
+                INSERT INTO price_rollup_state (stale_from) VALUES ('-infinity')
+                ON CONFLICT (id) DO NOTHING;
+            """)
+            logger.info("Price daily rollup view created/verified")
             logger.info("Intraday-focused database tables and indexes setup completed successfully!")
             
         except Exception as e:
             logger.error(f"Failed to create database tables: {e}")
             raise
     
+    def _table_exists(self, table_name: str) -> bool:
+        """Check whether a table exists in the current schema search path"""
+        result = self.execute_query("SELECT to_regclass(%s) AS oid", (table_name,), fetch_one=True)
+        return bool(result and result['oid'])
+    
+    def _is_partitioned(self, table_name: str) -> bool:
+        """Check whether a table is natively partitioned or a TimescaleDB hypertable"""
+        result = self.execute_query(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            (table_name,), fetch_one=True
+        )
+        if result:
+            return True
+        
+        if self._timescaledb_installed():
+            result = self.execute_query(
+                "SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = %s",
+                (table_name,), fetch_one=True
+            )
+            return bool(result)
+        return False
+    
+    def _timescaledb_installed(self) -> bool:
+        """Check whether the timescaledb extension is installed in this database"""
+        result = self.execute_query(
+            "SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'", fetch_one=True
+        )
+        return bool(result)
+    
+    def _enable_timescaledb(self) -> bool:
+        """Enable the timescaledb extension if the server provides it"""
+        try:
+            available = self.execute_query(
+                "SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb'", fetch_one=True
+            )
+            if not available:
+                logger.info("TimescaleDB not available, using native range partitioning")
+                return False
+            
+            self.execute_query("CREATE EXTENSION IF NOT EXISTS timescaledb")
+            logger.info("TimescaleDB extension enabled")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Could not enable TimescaleDB, using native range partitioning: {e}")
+            return False
+    
+    def ensure_intraday_partitions(self, start: Optional[datetime] = None,
+                                   months_ahead: int = PARTITION_MONTHS_AHEAD) -> int:
+        """
+        Create monthly range partitions of stock_prices_intraday
+        
+        Args:
+            start: First month to cover (defaults to the previous month)
+            months_ahead: Number of months after the current month to pre-create
+        
+        Returns:
+            Number of partitions created or verified
+        """
+        if not self._is_partitioned('stock_prices_intraday') or self._timescaledb_installed():
+            return 0
+        
+        now = datetime.utcnow()
+        if start is None:
+            start = datetime(now.year, now.month, 1)
+            start = datetime(start.year - 1, 12, 1) if start.month == 1 else datetime(start.year, start.month - 1, 1)
+        
+        year, month = start.year, start.month
+        end_index = now.year * 12 + now.month - 1 + months_ahead
+        partitions = 0
+        
+        while year * 12 + month - 1 <= end_index:
+            next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+            partition_name = f"stock_prices_intraday_y{year:04d}m{month:02d}"
+            
+            try:
+                self.execute_query(f"""
+                    CREATE TABLE IF NOT EXISTS {partition_name}
+                    PARTITION OF stock_prices_intraday
+                    FOR VALUES FROM ('{year:04d}-{month:02d}-01') TO ('{next_year:04d}-{next_month:02d}-01')
+                """)
+                partitions += 1
+            except Exception as e:
+                # Typically the default partition already holds rows for this month
+                logger.warning(f"Could not create partition {partition_name}: {e}")
+            
+            year, month = next_year, next_month
+        
+        logger.info(f"Verified {partitions} monthly partitions for stock_prices_intraday")
+        return partitions
+    
     def close(self):
         """Close the connection pool"""
-        if self.connection_pool:
-            self.connection_pool.closeall()
-            logger.info("Database connection pool closed")
+        with self._pool_lock:
+            if self.connection_pool:
+                self.connection_pool.closeall()
+                self.connection_pool = None
+                logger.info("Database connection pool closed")
 
 # Function to initialize database (lazy initialization)
 def init_db():
     """Initialize the database with tables and indexes"""
-    db_manager = DatabaseManager()
+    # Reuse the shared manager so the pool stays warm for later callers
+    db_manager = DatabaseManager.get()
     db_manager.init_connection_pool()
     db_manager.create_tables()
-    db_manager.close()
     return db_manager
@@ -5,10 +5,11 @@ Contains Extract, Transform, and Load modules
 """
 
 from .extract import DataExtractor
-from .transform import DataTransformer
+from .transform import DataTransformer, TransformResult
 from .load import DataLoader
+from .cache import ResponseCache
 
-__all__ = ['DataExtractor', 'DataTransformer', 'DataLoader']
+__all__ = ['DataExtractor', 'DataTransformer', 'TransformResult', 'DataLoader', 'ResponseCache']
 
 # Version information
 __version__ = '1.0.0'
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Response Cache Module for Stock Data ETL
+Disk-backed cache of Alpha Vantage responses with ETag / Last-Modified revalidation
+"""
+
+import os
+import logging
+import tempfile
+import threading
+import time
+import orjson
+from typing import Dict, Optional, Any, Tuple
+from datetime import datetime
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheEntry:
+    """A cached API payload and the validators needed to revalidate it"""
+    data: Dict[str, Any]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+class ResponseCache:
+    """Caches successful API responses per (symbol, interval) in memory and on disk"""
+    
+    def __init__(self,
+                 cache_dir: Optional[str] = None,
+                 open_ttl: float = 5,
+                 closed_ttl: float = 3600,
+                 market_open_hour: int = 9,
+                 market_close_hour: int = 16):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'alpha_vantage_cache')
+        self.open_ttl = open_ttl
+        self.closed_ttl = closed_ttl
+        self.market_open_hour = market_open_hour
+        self.market_close_hour = market_close_hour
+        self._entries: Dict[Tuple[str, str], CacheEntry] = {}
+        self._lock = threading.Lock()
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def _path(self, symbol: str, interval: str) -> str:
+        """File holding the cached response for a symbol/interval"""
+        return os.path.join(self.cache_dir, f"{symbol}_{interval}.json")
+    
+    def is_market_open(self, current_time: Optional[datetime] = None) -> bool:
+        """Whether responses are expected to change (weekday within market hours)"""
+        current_time = current_time or datetime.utcnow()
+        return current_time.weekday() < 5 and self.market_open_hour <= current_time.hour < self.market_close_hour
+    
+    def ttl(self) -> float:
+        """Seconds a cached response is served without revalidation"""
+        return self.open_ttl if self.is_market_open() else self.closed_ttl
+    
+    def get(self, symbol: str, interval: str) -> Optional[CacheEntry]:
+        """Return the cached entry for a symbol/interval, loading it from disk if needed"""
+        key = (symbol, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        
+        try:
+            with open(self._path(symbol, interval), 'rb') as f:
+                entry = CacheEntry(**orjson.loads(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry for {symbol} ({interval}): {e}")
+            return None
+        
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+    
+    @staticmethod
+    def bar_seconds(interval: str) -> Optional[int]:
+        """Bar length in seconds for an intraday interval such as '5min' (None if unrecognised)"""
+        if interval.endswith('min') and interval[:-3].isdigit():
+            return int(interval[:-3]) * 60
+        return None
+    
+    def is_fresh(self, entry: CacheEntry, interval: Optional[str] = None) -> bool:
+        """
+        Whether an entry is young enough to be served without contacting the API
+        
+        While the market is open, an entry fetched during the current bar of
+        `interval` stays fresh until that bar closes, since no new bar can
+        appear before then. Otherwise the plain TTL applies.
+        """
+        now = time.time()
+        if now - entry.fetched_at < self.ttl():
+            return True
+        
+        bar = self.bar_seconds(interval) if interval else None
+        return bar is not None and self.is_market_open() and entry.fetched_at // bar == now // bar
+    
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for revalidating an entry"""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+    
+    def put(self, symbol: str, interval: str, data: Dict[str, Any],
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store a successful response payload"""
+        entry = CacheEntry(data=data, etag=etag, last_modified=last_modified, fetched_at=time.time())
+        with self._lock:
+            self._entries[(symbol, interval)] = entry
+        self._write(symbol, interval, entry)
+    
+    def touch(self, symbol: str, interval: str, entry: CacheEntry):
+        """Mark an entry as revalidated (HTTP 304) so its TTL starts over"""
+        entry.fetched_at = time.time()
+        self._write(symbol, interval, entry)
+    
+    def _write(self, symbol: str, interval: str, entry: CacheEntry):
+        """Atomically persist an entry to disk"""
+        path = self._path(symbol, interval)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps({
+                    'data': entry.data,
+                    'etag': entry.etag,
+                    'last_modified': entry.last_modified,
+                    'fetched_at': entry.fetched_at
+                }))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write cache entry for {symbol} ({interval}): {e}")
@@ -4,37 +4,308 @@ Data Extraction Module for Stock Data ETL
 Handles API calls to Alpha Vantage for intraday stock data
 """
 
+import asyncio
+import aiohttp
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
+import os
+import random
+import threading
 import time
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
+from types import MappingProxyType
 from typing import Dict, Optional, Any
 from datetime import datetime
 
+from .cache import ResponseCache
+
 logger = logging.getLogger(__name__)
 
+# Alpha Vantage OHLCV field names, in column order
+OHLCV_FIELDS = ('1. open', '2. high', '3. low', '4. close', '5. volume')
+OHLCV_GETTER = itemgetter(*OHLCV_FIELDS)
+
+# Supported intraday intervals and their response payload keys, built once
+TIME_SERIES_KEYS = {iv: f'Time Series ({iv})' for iv in ('1min', '5min', '15min', '30min', '60min')}
+
+# Shared read-only default for missing payload sections
+EMPTY_DICT = MappingProxyType({})
+
+def time_series_to_columns(time_series: Dict[str, Dict[str, str]]) -> Dict[str, np.ndarray]:
+    """
+    Convert an Alpha Vantage time series dict into column arrays
+    
+    Args:
+        time_series: Mapping of timestamp string to OHLCV string fields
+    
+    Returns:
+        Dictionary of equal-length arrays: 'timestamp' (datetime64[s]),
+        'open', 'high', 'low', 'close' (float64) and 'volume' (int64)
+    
+    Raises:
+        KeyError, ValueError: If a bar is missing a field or is not numeric
+    """
+    timestamps = np.array(list(time_series.keys()), dtype='datetime64[s]')
+    values = np.array([OHLCV_GETTER(bar) for bar in time_series.values()], dtype=np.float64)
+    values = values.reshape(len(timestamps), len(OHLCV_FIELDS))
+    
+    return {
+        'timestamp': timestamps,
+        'open': values[:, 0],
+        'high': values[:, 1],
+        'low': values[:, 2],
+        'close': values[:, 3],
+        'volume': values[:, 4].astype(np.int64)
+    }
+
+class RateLimiter:
+    """
+    Thread-safe token bucket pacing API calls on the monotonic clock
+    
+    The interval between calls adapts to server feedback: it doubles on
+    throttling (429 / rate-limit Note) and halves back towards the quota
+    floor (60 / calls_per_minute seconds) on success. Waits are jittered
+    so several processes sharing a key don't fire in lockstep. A sliding
+    60-second window of granted slots caps calls at the quota even when
+    burst > 1, and set_limit() retunes the quota from server headers.
+    """
+    
+    def __init__(self, calls_per_minute: int = 5, burst: int = 1,
+                 max_interval: float = 300.0, jitter: float = 0.2):
+        self.calls_per_minute = calls_per_minute
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        
+        self.min_interval = 60.0 / calls_per_minute
+        self.max_interval = max(max_interval, self.min_interval)
+        self.target_interval = self.min_interval
+        self.jitter = jitter
+        
+        # Monotonic times of the slots granted in the last minute, ascending
+        self._window = deque()
+    
+    @property
+    def refill_rate(self) -> float:
+        """Tokens added per second"""
+        return 1.0 / self.target_interval
+    
+    def _reserve(self) -> float:
+        """Take one token and return how many seconds the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+            self.last_refill = now
+            
+            # Tokens may go negative: each waiter reserves its own future slot
+            self.tokens -= 1
+            wait_time = 0.0
+            if self.tokens < 0:
+                deficit = -self.tokens
+                wait_time = deficit * self.target_interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+                # Jitter never pushes a call ahead of the quota
+                wait_time = max(wait_time, deficit * self.min_interval)
+            
+            window = self._window
+            while window and window[0] <= now - 60.0:
+                window.popleft()
+            slot = now + wait_time
+            if window:
+                # Slots are granted in order, and never more than the quota per minute
+                slot = max(slot, window[-1])
+                if len(window) >= self.calls_per_minute:
+                    slot = max(slot, window[-self.calls_per_minute] + 60.0)
+            window.append(slot)
+            return slot - now
+    
+    def set_limit(self, calls_per_minute: int):
+        """Adopt a per-minute quota reported by the server (e.g. X-RateLimit-Limit)"""
+        if calls_per_minute <= 0:
+            return
+        with self._lock:
+            if calls_per_minute == self.calls_per_minute:
+                return
+            # Keep any current backoff proportional to the new quota floor
+            new_min_interval = 60.0 / calls_per_minute
+            self.target_interval = max(new_min_interval, self.target_interval * new_min_interval / self.min_interval)
+            self.calls_per_minute = calls_per_minute
+            self.min_interval = new_min_interval
+            self.max_interval = max(self.max_interval, self.min_interval)
+        logger.info(f"Rate limiting: server quota is {calls_per_minute} calls per minute")
+    
+    def record_success(self):
+        """Relax pacing back towards the quota floor after a successful call"""
+        with self._lock:
+            self.target_interval = max(self.min_interval, self.target_interval / 2)
+    
+    def record_throttle(self, retry_after: Optional[float] = None):
+        """Back off after the server signalled throttling"""
+        with self._lock:
+            backoff = max(self.target_interval * 2, retry_after or 0.0)
+            self.target_interval = min(self.max_interval, backoff)
+            # Drop any saved burst so the next call waits a full interval
+            self.tokens = min(self.tokens, 0.0)
+            self.last_refill = time.monotonic()
+        logger.warning(f"Rate limiting: backing off to {self.target_interval:.1f}s between calls")
+    
+    def acquire(self):
+        """Block until a call is permitted"""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            logger.info(f"Rate limiting: waiting {wait_time:.2f} seconds")
+            time.sleep(wait_time)
+    
+    async def acquire_async(self):
+        """Wait until a call is permitted without blocking the event loop"""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            logger.info(f"Rate limiting: waiting {wait_time:.2f} seconds")
+            await asyncio.sleep(wait_time)
+    
+    def available_tokens(self) -> float:
+        """Current token balance (negative when callers are queued)"""
+        with self._lock:
+            elapsed = time.monotonic() - self.last_refill
+            return min(self.capacity, self.tokens + elapsed * self.refill_rate)
+
 class DataExtractor:
     """Extracts stock data from Alpha Vantage API"""
     
-    def __init__(self, api_key: str):
+    # One keep-alive session shared by every extractor in the process
+    _shared_session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+    
+    def __init__(self, api_key: str, calls_per_minute: int = 5):
         self.api_key = api_key
         self.base_url = "https://www.alphavantage.co/query"
-        self.session = requests.Session()
+        self.session = self._get_shared_session()
         
         # Rate limiting: Alpha Vantage allows 5 API calls per minute for free tier
-        self.rate_limit_delay = 12  # seconds between calls (60/5 = 12)
-        self.last_call_time = 0
+        self.calls_per_minute = calls_per_minute
+        self.rate_limiter = RateLimiter(calls_per_minute)
+        
+        # Concurrency settings for the async extraction path
+        self.max_concurrent_requests = 5
+        self.connector_limit = 10
+        self.request_timeout = 30
+        # Retries after a throttled (429 / Note) async request; the limiter sets the backoff
+        self.throttle_retries = 3
+        
+        # Disk cache of successful responses, revalidated with ETag / Last-Modified
+        self.cache = ResponseCache(os.getenv('ALPHA_VANTAGE_CACHE_DIR'))
+    
+    @classmethod
+    def _get_shared_session(cls) -> requests.Session:
+        """Return the process-wide HTTP session, creating it on first use"""
+        if cls._shared_session is None:
+            with cls._session_lock:
+                if cls._shared_session is None:
+                    # 429s are left to the RateLimiter so it can adapt its pacing
+                    retry = Retry(
+                        total=3,
+                        backoff_factor=0.5,
+                        status_forcelist=[500, 502, 503, 504],
+                        allowed_methods=["GET"]
+                    )
+                    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=retry)
+                    session = requests.Session()
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    cls._shared_session = session
+        return cls._shared_session
     
     def _rate_limit(self):
         """Implement rate limiting for API calls"""
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_call_time
+        self.rate_limiter.acquire()
+    
+    async def _rate_limit_async(self):
+        """Wait for an API call slot without blocking the event loop"""
+        await self.rate_limiter.acquire_async()
+    
+    def _build_params(self, symbol: str, interval: str) -> Dict[str, str]:
+        """Build query parameters for an intraday API call (symbol already upper-cased)"""
+        return {
+            'function': 'TIME_SERIES_INTRADAY',
+            'symbol': symbol,
+            'interval': interval,
+            'apikey': self.api_key,
+            'outputsize': 'compact'  # Get last 100 data points
+        }
+    
+    def _observe_rate_limit(self, status: int, headers) -> bool:
+        """
+        Feed HTTP rate-limit signals to the limiter
+        
+        Returns:
+            True if the response was a throttling response (HTTP 429)
+        """
+        retry_after = headers.get('Retry-After')
+        try:
+            retry_after = float(retry_after) if retry_after is not None else None
+        except ValueError:
+            retry_after = None  # HTTP-date form; fall back to exponential backoff
         
-        if time_since_last_call < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_call
-            logger.info(f"Rate limiting: waiting {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
+        limit = headers.get('X-RateLimit-Limit')
+        if limit is not None and limit.isdigit():
+            self.rate_limiter.set_limit(int(limit))
         
-        self.last_call_time = time.time()
+        if status == 429 or headers.get('X-RateLimit-Remaining') == '0':
+            self.rate_limiter.record_throttle(retry_after)
+        return status == 429
+    
+    def _parse_response(self, symbol: str, interval: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Validate an API response payload and wrap it in the extractor output format (symbol already upper-cased)"""
+        # Check for API errors
+        if 'Error Message' in data:
+            logger.error(f"API Error for {symbol}: {data['Error Message']}")
+            return None
+        
+        if 'Note' in data:
+            logger.warning(f"API Rate Limit Note for {symbol}: {data['Note']}")
+            self.rate_limiter.record_throttle()
+            return None
+        
+        # Check if we have time series data
+        time_series_key = TIME_SERIES_KEYS.get(interval) or f'Time Series ({interval})'
+        if time_series_key not in data:
+            logger.error(f"No time series data found for {symbol}. Response: {data}")
+            return None
+        
+        time_series_data = data[time_series_key]
+        
+        if not time_series_data:
+            logger.warning(f"No intraday data available for {symbol}")
+            return None
+        
+        logger.info(f"Successfully extracted {len(time_series_data)} data points for {symbol}")
+        
+        # Columnar view for vectorized consumers; malformed bars leave it to the per-row path
+        try:
+            columns = time_series_to_columns(time_series_data)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Could not build columnar time series for {symbol}: {e}")
+            columns = None
+        
+        meta_data = data.get('Meta Data') or EMPTY_DICT
+        
+        return {
+            'symbol': symbol,
+            'interval': interval,
+            'time_series': time_series_data,
+            'columns': columns,
+            'metadata': {
+                'last_refreshed': meta_data.get('3. Last Refreshed', ''),
+                'timezone': meta_data.get('6. Time Zone', ''),
+                'extraction_timestamp': datetime.utcnow().isoformat()
+            }
+        }
     
     def extract_intraday_data(self, symbol: str, interval: str = "5min") -> Optional[Dict[str, Any]]:
         """
@@ -47,57 +318,41 @@ class DataExtractor:
         Returns:
             Dictionary containing intraday data or None if failed
         """
+        symbol = symbol.upper()
         try:
+            cached = self.cache.get(symbol, interval)
+            if cached and self.cache.is_fresh(cached, interval):
+                logger.info(f"Using cached intraday data for {symbol} with {interval} interval")
+                return self._parse_response(symbol, interval, cached.data)
+            
             self._rate_limit()
             
-            params = {
-                'function': 'TIME_SERIES_INTRADAY',
-                'symbol': symbol.upper(),
-                'interval': interval,
-                'apikey': self.api_key,
-                'outputsize': 'compact'  # Get last 100 data points
-            }
+            params = self._build_params(symbol, interval)
             
             logger.info(f"Extracting intraday data for {symbol} with {interval} interval")
             
-            response = self.session.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
+            response = self.session.get(self.base_url, params=params, timeout=30,
+                                        headers=self.cache.conditional_headers(cached))
             
-            # Check for API errors
-            if 'Error Message' in data:
-                logger.error(f"API Error for {symbol}: {data['Error Message']}")
+            if self._observe_rate_limit(response.status_code, response.headers):
+                logger.warning(f"API throttled request for {symbol} (HTTP 429)")
                 return None
             
-            if 'Note' in data:
-                logger.warning(f"API Rate Limit Note for {symbol}: {data['Note']}")
-                return None
-            
-            # Check if we have time series data
-            time_series_key = f'Time Series ({interval})'
-            if time_series_key not in data:
-                logger.error(f"No time series data found for {symbol}. Response: {data}")
-                return None
+            if response.status_code == 304 and cached:
+                logger.info(f"Intraday data for {symbol} not modified, using cached copy")
+                self.cache.touch(symbol, interval, cached)
+                return self._parse_response(symbol, interval, cached.data)
             
-            time_series_data = data[time_series_key]
+            response.raise_for_status()
             
-            if not time_series_data:
-                logger.warning(f"No intraday data available for {symbol}")
-                return None
+            data = orjson.loads(response.content)
             
-            logger.info(f"Successfully extracted {len(time_series_data)} data points for {symbol}")
-            
-            return {
-                'symbol': symbol.upper(),
-                'interval': interval,
-                'time_series': time_series_data,
-                'metadata': {
-                    'last_refreshed': data.get('Meta Data', {}).get('3. Last Refreshed', ''),
-                    'timezone': data.get('Meta Data', {}).get('6. Time Zone', ''),
-                    'extraction_timestamp': datetime.utcnow().isoformat()
-                }
-            }
+            result = self._parse_response(symbol, interval, data)
+            if result:
+                self.rate_limiter.record_success()
+                self.cache.put(symbol, interval, data,
+                               response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return result
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Request failed for {symbol}: {e}")
@@ -105,16 +360,139 @@ class DataExtractor:
         except requests.exceptions.Timeout:
             logger.error(f"Request timeout for {symbol}")
             return None
-        except requests.exceptions.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid JSON response for {symbol}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error extracting data for {symbol}: {e}")
+            return None
+    
+    def client_session(self) -> aiohttp.ClientSession:
+        """Create an aiohttp session configured for the Alpha Vantage API (use as async context manager)"""
+        connector = aiohttp.TCPConnector(limit=self.connector_limit, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+    
+    async def extract_intraday_data_async(self, session: aiohttp.ClientSession, symbol: str,
+                                          interval: str = "5min",
+                                          semaphore: Optional[asyncio.Semaphore] = None) -> Optional[Dict[str, Any]]:
+        """
+        Extract intraday stock data from Alpha Vantage API without blocking the event loop
+        
+        Args:
+            session: Shared aiohttp session
+            symbol: Stock symbol (e.g., 'AAPL')
+            interval: Time interval ('1min', '5min', '15min', '30min', '60min')
+            semaphore: Optional semaphore bounding the number of in-flight requests
+        
+        Returns:
+            Dictionary containing intraday data or None if failed
+        """
+        symbol = symbol.upper()
+        try:
+            cached = self.cache.get(symbol, interval)
+            if cached and self.cache.is_fresh(cached, interval):
+                logger.info(f"Using cached intraday data for {symbol} with {interval} interval")
+                return self._parse_response(symbol, interval, cached.data)
+            
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            
+            params = self._build_params(symbol, interval)
+            
+            async with semaphore:
+                for attempt in range(self.throttle_retries + 1):
+                    # Each throttle widened the limiter's interval, so this wait is the backoff
+                    await self._rate_limit_async()
+                    
+                    logger.info(f"Extracting intraday data for {symbol} with {interval} interval")
+                    
+                    async with session.get(self.base_url, params=params,
+                                           headers=self.cache.conditional_headers(cached)) as response:
+                        if self._observe_rate_limit(response.status, response.headers):
+                            logger.warning(f"API throttled request for {symbol} (HTTP 429, attempt {attempt + 1})")
+                            continue
+                        
+                        if response.status == 304 and cached:
+                            logger.info(f"Intraday data for {symbol} not modified, using cached copy")
+                            self.cache.touch(symbol, interval, cached)
+                            return self._parse_response(symbol, interval, cached.data)
+                        
+                        response.raise_for_status()
+                        data = orjson.loads(await response.read())
+                        etag = response.headers.get('ETag')
+                        last_modified = response.headers.get('Last-Modified')
+                    
+                    if 'Note' in data and attempt < self.throttle_retries:
+                        logger.warning(f"API Rate Limit Note for {symbol} (attempt {attempt + 1}): {data['Note']}")
+                        self.rate_limiter.record_throttle()
+                        continue
+                    break
+                else:
+                    logger.error(f"API kept throttling requests for {symbol}, giving up")
+                    return None
+            
+            result = self._parse_response(symbol, interval, data)
+            if result:
+                self.rate_limiter.record_success()
+                self.cache.put(symbol, interval, data, etag, last_modified)
+            return result
+            
+        except asyncio.TimeoutError:
+            logger.error(f"Request timeout for {symbol}")
+            return None
+        except aiohttp.ClientError as e:
+            logger.error(f"Request failed for {symbol}: {e}")
+            return None
+        except ValueError as e:
             logger.error(f"Invalid JSON response for {symbol}: {e}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error extracting data for {symbol}: {e}")
             return None
     
+    async def extract_multiple_stocks_async(self, symbols: list, interval: str = "5min") -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Extract intraday data for multiple stocks concurrently
+        
+        Requests share one connection pool and are paced by the rate limiter,
+        so N symbols cost roughly one rate-limit window instead of N round trips.
+        
+        Args:
+            symbols: List of stock symbols
+            interval: Time interval for data
+        
+        Returns:
+            Dictionary mapping symbols to their extracted data
+        """
+        logger.info(f"Starting concurrent extraction for {len(symbols)} stocks with {interval} interval")
+        
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        
+        async with self.client_session() as session:
+            extracted = await asyncio.gather(
+                *[self.extract_intraday_data_async(session, symbol, interval, semaphore) for symbol in symbols],
+                return_exceptions=True
+            )
+        
+        results = {}
+        for symbol, data in zip(symbols, extracted):
+            if isinstance(data, BaseException):
+                logger.error(f"Unexpected error extracting data for {symbol}: {data}")
+                data = None
+            results[symbol] = data
+        
+        successful_extractions = sum(1 for data in results.values() if data is not None)
+        logger.info(f"Extraction completed. {successful_extractions}/{len(symbols)} stocks successful")
+        
+        return results
+    
     def extract_multiple_stocks(self, symbols: list, interval: str = "5min") -> Dict[str, Optional[Dict[str, Any]]]:
         """
-        Extract intraday data for multiple stocks
+        Extract intraday data for multiple stocks using a thread pool
+        
+        Blocking requests release the GIL, so sync callers get concurrent
+        extraction; the shared rate limiter still paces the calls.
         
         Args:
             symbols: List of stock symbols
@@ -127,14 +505,21 @@ class DataExtractor:
         
         logger.info(f"Starting extraction for {len(symbols)} stocks with {interval} interval")
         
-        for symbol in symbols:
-            logger.info(f"Processing {symbol}...")
-            data = self.extract_intraday_data(symbol, interval)
-            results[symbol] = data
-            
-            # Add small delay between different symbols to be respectful to API
-            if len(symbols) > 1:
-                time.sleep(1)
+        if not symbols:
+            return results
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent_requests, len(symbols))) as executor:
+            futures = {executor.submit(self.extract_intraday_data, symbol, interval): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    results[symbol] = future.result()
+                except Exception as e:
+                    logger.error(f"Unexpected error extracting data for {symbol}: {e}")
+                    results[symbol] = None
+        
+        # Preserve the caller's symbol order
+        results = {symbol: results[symbol] for symbol in symbols}
         
         successful_extractions = sum(1 for data in results.values() if data is not None)
         logger.info(f"Extraction completed. {successful_extractions}/{len(symbols)} stocks successful")
@@ -146,13 +531,13 @@ class DataExtractor:
         return {
             'api_key_configured': bool(self.api_key),
             'base_url': self.base_url,
-            'rate_limit_delay': self.rate_limit_delay,
-            'last_call_time': self.last_call_time,
+            'calls_per_minute': self.rate_limiter.calls_per_minute,
+            'available_tokens': self.rate_limiter.available_tokens(),
+            'target_interval_seconds': self.rate_limiter.target_interval,
+            'max_concurrent_requests': self.max_concurrent_requests,
             'session_active': self.session is not None
         }
     
     def close(self):
-        """Close the session"""
-        if self.session:
-            self.session.close()
-            logger.info("Data extractor session closed")
+        """Release this extractor; the shared HTTP session stays open for other extractors"""
+        logger.info("Data extractor released (shared session kept alive)")
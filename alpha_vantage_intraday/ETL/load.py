@@ -5,18 +5,92 @@ Handles loading transformed data into PostgreSQL database
 """
 
 import logging
+import threading
+import orjson
+import psycopg2.extensions
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+from datetime import datetime, timezone
 from alpha_vantage_intraday.MODELS import Stock, StockPriceIntraday
 from alpha_vantage_intraday.DB import DatabaseManager
+from .transform import TransformResult
 
 logger = logging.getLogger(__name__)
 
+# load_multiple_stocks batches with at least this many price rows in total go
+# through one COPY + staging-table upsert; smaller ones load symbol by symbol
+COPY_MIN_ROWS = 1024
+
+# Symbols load_multiple_stocks loads at once, each on its own pooled connection
+LOAD_WORKERS = 8
+
+# Price upsert taking the whole batch as one jsonb array bound to a single
+# parameter, expanded server-side by jsonb_to_recordset; the only other
+# parameter is created_at. Each element carries the keys of _PRICE_ROW_TYPE,
+# so a new column means one more key here rather than a wider row tuple.
+# ON CONFLICT rather than MERGE: MERGE's match step can't see another writer's
+# uncommitted bars, so concurrent loads of the same bars would fail on the
+# unique key instead of updating
+_PRICE_ROW_TYPE = """
+    r(stock_symbol varchar, timestamp timestamp, open_price float8, high_price float8,
+      low_price float8, close_price float8, volume bigint, interval varchar)
+"""
+_PRICE_UPSERT_SQL = f"""
+    INSERT INTO stock_prices_intraday 
+    (stock_symbol, timestamp, open_price, high_price, low_price, 
+     close_price, volume, interval, created_at)
+    SELECT r.stock_symbol, r.timestamp, r.open_price, r.high_price, r.low_price,
+           r.close_price, r.volume, r.interval, %s
+    FROM jsonb_to_recordset(%s::jsonb) AS {_PRICE_ROW_TYPE}
+    ON CONFLICT (stock_symbol, timestamp, interval) DO UPDATE
+    SET open_price = EXCLUDED.open_price, high_price = EXCLUDED.high_price,
+        low_price = EXCLUDED.low_price, close_price = EXCLUDED.close_price,
+        volume = EXCLUDED.volume, updated_at = EXCLUDED.created_at
+"""
+
+# Fixed single-row statements, run as server-side prepared statements
+_STOCK_INSERT_STATEMENT = 'etl_insert_stock'
+_STOCK_INSERT_SQL = """
+    INSERT INTO stocks (symbol, company_name, exchange, is_active, created_at)
+    VALUES ($1, $2, $3, $4, $5)
+    ON CONFLICT (symbol) DO NOTHING
+    RETURNING id
+"""
+
+# Existence check and multi-row stock insert used by ensure_stocks (execute_values template)
+_EXISTING_STOCKS_SQL = "SELECT symbol FROM stocks WHERE symbol = ANY(%s)"
+_STOCKS_INSERT_SQL = """
+    INSERT INTO stocks (symbol, company_name, exchange, is_active, created_at)
+    VALUES %s
+    ON CONFLICT (symbol) DO NOTHING
+"""
+
+# Multi-row INSERT used by flush_job_logs (execute_values template)
+_JOB_LOG_SQL = """
+    INSERT INTO etl_job_logs 
+    (job_name, status, start_time, end_time, records_processed, 
+     total_records, error_message, created_at)
+    VALUES %s
+"""
+
+def utc_now() -> datetime:
+    """Current UTC time as a naive datetime, matching the TIMESTAMP columns"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 class DataLoader:
     """Loads transformed data into the database"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, batch_size: int = 1000, load_workers: int = LOAD_WORKERS):
         self.db_manager = db_manager
+        # Rows per multi-row INSERT/UPDATE statement
+        self.batch_size = batch_size
+        self.load_workers = max(1, load_workers)
+        
+        self.db_manager.register_prepared(_STOCK_INSERT_STATEMENT, _STOCK_INSERT_SQL)
+        
+        # ETL job log rows waiting for flush_job_logs()
+        self._log_buffer: List[tuple] = []
+        self._log_lock = threading.Lock()
     
     def load_stock(self, stock: Stock) -> bool:
         """
@@ -29,21 +103,7 @@ class DataLoader:
             True if successful, False otherwise
         """
         try:
-            # Check if stock already exists
-            check_sql = "SELECT id FROM stocks WHERE symbol = %s"
-            existing_stock = self.db_manager.execute_query(check_sql, (stock.symbol,), fetch_one=True)
-            
-            if existing_stock:
-                logger.info(f"Stock {stock.symbol} already exists, skipping insert")
-                return True
-            
-            # Insert new stock
-            insert_sql = """
-                INSERT INTO stocks (symbol, company_name, exchange, is_active, created_at)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (symbol) DO NOTHING
-            """
-            
+            # An existing symbol makes the insert a no-op that returns no row
             params = (
                 stock.symbol,
                 stock.company_name,
@@ -52,21 +112,64 @@ class DataLoader:
                 stock.created_at
             )
             
-            self.db_manager.execute_query(insert_sql, params)
-            logger.info(f"Successfully loaded stock {stock.symbol}")
+            inserted = self.db_manager.execute_prepared(_STOCK_INSERT_STATEMENT, params, fetch_one=True)
+            if inserted:
+                logger.debug("Successfully loaded stock %s", stock.symbol)
+            else:
+                logger.debug("Stock %s already exists, skipping insert", stock.symbol)
             return True
             
         except Exception as e:
             logger.error(f"Failed to load stock {stock.symbol}: {e}")
             return False
     
-    def load_intraday_prices(self, symbol: str, price_records: List[StockPriceIntraday]) -> int:
+    def ensure_stocks(self, stocks: List[Stock]) -> int:
+        """
+        Insert the stocks that don't exist yet, in two statements for any number of symbols
+        
+        One SELECT finds the symbols already present; the rest go out as a
+        single multi-row INSERT (ON CONFLICT still covers concurrent loaders).
+        
+        Args:
+            stocks: Stock objects to make sure exist
+        
+        Returns:
+            Number of stocks inserted
+        
+        Raises:
+            Exception: if either statement fails
+        """
+        if not stocks:
+            return 0
+        
+        existing = self.db_manager.execute_query(
+            _EXISTING_STOCKS_SQL,
+            ([stock.symbol for stock in stocks],),
+            fetch=True,
+            cursor_factory=psycopg2.extensions.cursor
+        )
+        existing_symbols = {row[0] for row in existing}
+        
+        rows = [
+            (stock.symbol, stock.company_name, stock.exchange, stock.is_active, stock.created_at)
+            for stock in stocks if stock.symbol not in existing_symbols
+        ]
+        if not rows:
+            return 0
+        
+        inserted = self.db_manager.execute_values_batch(_STOCKS_INSERT_SQL, rows)
+        logger.info(f"Loaded {inserted} new stocks ({len(existing_symbols)} already present)")
+        return inserted
+    
+    def load_intraday_prices(self, symbol: str, price_records: List[StockPriceIntraday],
+                             now: Optional[datetime] = None) -> int:
         """
         Load intraday price records into database
         
         Args:
             symbol: Stock symbol
             price_records: List of StockPriceIntraday objects
+            now: Naive UTC load time stamped on every row (default: current time)
         
         Returns:
             Number of records successfully loaded
@@ -76,91 +179,40 @@ class DataLoader:
             return 0
         
         try:
+            # Upsert in statements of up to batch_size rows, matching existing
+            # bars on (stock_symbol, timestamp, interval)
+            now = now or utc_now()
             loaded_count = 0
+            for start in range(0, len(price_records), self.batch_size):
+                payload = orjson.dumps([
+                    {'stock_symbol': record.stock_symbol, 'timestamp': record.timestamp,
+                     'open_price': record.open_price, 'high_price': record.high_price,
+                     'low_price': record.low_price, 'close_price': record.close_price,
+                     'volume': record.volume, 'interval': record.interval}
+                    for record in price_records[start:start + self.batch_size]
+                ]).decode()
+                loaded_count += self.db_manager.execute_query(_PRICE_UPSERT_SQL, (now, payload))
             
-            for price_record in price_records:
-                if self._load_single_price_record(price_record):
-                    loaded_count += 1
-            
-            logger.info(f"Successfully loaded {loaded_count}/{len(price_records)} price records for {symbol}")
+            logger.debug("Successfully loaded %d/%d price records for %s", loaded_count, len(price_records), symbol)
             return loaded_count
             
         except Exception as e:
             logger.error(f"Failed to load price records for {symbol}: {e}")
             return 0
     
-    def _load_single_price_record(self, price_record: StockPriceIntraday) -> bool:
-        """Load a single price record into the database"""
-        try:
-            # Check for duplicate (same symbol, timestamp, and interval)
-            check_sql = """
-                SELECT id FROM stock_prices_intraday 
-                WHERE stock_symbol = %s AND timestamp = %s AND interval = %s
-            """
-            
-            params = (price_record.stock_symbol, price_record.timestamp, price_record.interval)
-            existing_record = self.db_manager.execute_query(check_sql, params, fetch_one=True)
-            
-            if existing_record:
-                # Update existing record
-                update_sql = """
-                    UPDATE stock_prices_intraday 
-                    SET open_price = %s, high_price = %s, low_price = %s, 
-                        close_price = %s, volume = %s, updated_at = %s
-                    WHERE stock_symbol = %s AND timestamp = %s AND interval = %s
-                """
-                
-                update_params = (
-                    price_record.open_price,
-                    price_record.high_price,
-                    price_record.low_price,
-                    price_record.close_price,
-                    price_record.volume,
-                    datetime.utcnow(),
-                    price_record.stock_symbol,
-                    price_record.timestamp,
-                    price_record.interval
-                )
-                
-                self.db_manager.execute_query(update_sql, update_params)
-                logger.debug(f"Updated existing price record for {price_record.stock_symbol} at {price_record.timestamp}")
-                
-            else:
-                # Insert new record
-                insert_sql = """
-                    INSERT INTO stock_prices_intraday 
-                    (stock_symbol, timestamp, open_price, high_price, low_price, 
-                     close_price, volume, interval, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                
-                insert_params = (
-                    price_record.stock_symbol,
-                    price_record.timestamp,
-                    price_record.open_price,
-                    price_record.high_price,
-                    price_record.low_price,
-                    price_record.close_price,
-                    price_record.volume,
-                    price_record.interval,
-                    datetime.utcnow()
-                )
-                
-                self.db_manager.execute_query(insert_sql, insert_params)
-                logger.debug(f"Inserted new price record for {price_record.stock_symbol} at {price_record.timestamp}")
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to load price record for {price_record.stock_symbol} at {price_record.timestamp}: {e}")
-            return False
-    
-    def load_transformed_data(self, transformed_data: Dict[str, Any]) -> Dict[str, Any]:
+    def load_transformed_data(self, transformed_data: Optional[TransformResult],
+                              stock_loaded: bool = False) -> Dict[str, Any]:
         """
         Load complete transformed data (stock + prices) into database
         
+        The stock and its prices commit as one transaction (joining the
+        caller's, if one is open). If anything in it fails, nothing is kept and
+        the job is logged FAILED instead of SUCCESS. Job logs are buffered
+        until flush_job_logs().
+        
         Args:
             transformed_data: Transformed data from DataTransformer
+            stock_loaded: True when the stock row is known to exist (see ensure_stocks)
         
         Returns:
             Loading results with counts and status
@@ -170,26 +222,35 @@ class DataLoader:
             return {'success': False, 'error': 'No transformed data'}
         
         try:
-            symbol = transformed_data['metadata']['symbol']
-            stock = transformed_data['stock']
-            price_records = transformed_data['price_records']
+            symbol = transformed_data.symbol
+            stock = transformed_data.stock
+            price_records = transformed_data.price_records
             
-            logger.info(f"Loading transformed data for {symbol}")
+            logger.debug("Loading transformed data for %s", symbol)
             
-            # Load stock information
-            stock_loaded = self.load_stock(stock)
-            if not stock_loaded:
-                return {
-                    'success': False,
-                    'symbol': symbol,
-                    'error': 'Failed to load stock information'
-                }
+            # One timestamp for the symbol's rows, job log and result
+            now = utc_now()
             
-            # Load price records
-            prices_loaded = self.load_intraday_prices(symbol, price_records)
+            # One commit per symbol; bulk ingest doesn't wait on the WAL flush
+            with self.db_manager.transaction(synchronous_commit=False):
+                # Load stock information
+                stock_loaded = stock_loaded or self.load_stock(stock)
+                if not stock_loaded:
+                    return {
+                        'success': False,
+                        'symbol': symbol,
+                        'error': 'Failed to load stock information'
+                    }
+                
+                # Load price records
+                prices_loaded = self.load_intraday_prices(symbol, price_records, now)
+                
+                # Analytics read these days raw until the rollup is next refreshed
+                if prices_loaded:
+                    self.db_manager.mark_rollup_stale(min(record.timestamp for record in price_records))
             
-            # Log ETL job
-            self._log_etl_job(symbol, len(price_records), prices_loaded, 'SUCCESS')
+            # Log ETL job, only once the transaction has committed
+            self._log_etl_job(symbol, len(price_records), prices_loaded, 'SUCCESS', now=now)
             
             return {
                 'success': True,
@@ -197,14 +258,14 @@ class DataLoader:
                 'stock_loaded': stock_loaded,
                 'prices_loaded': prices_loaded,
                 'total_price_records': len(price_records),
-                'loading_timestamp': datetime.utcnow().isoformat()
+                'loading_timestamp': now.isoformat()
             }
             
         except Exception as e:
             logger.error(f"Failed to load transformed data: {e}")
             
-            # Log failed ETL job
-            symbol = transformed_data.get('metadata', {}).get('symbol', 'unknown')
+            # Log failed ETL job; the transaction has ended, so this commits on its own
+            symbol = transformed_data.symbol
             self._log_etl_job(symbol, 0, 0, 'FAILED', str(e))
             
             return {
@@ -213,7 +274,7 @@ class DataLoader:
                 'error': str(e)
             }
     
-    def load_multiple_stocks(self, transformed_data_dict: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    def load_multiple_stocks(self, transformed_data_dict: Dict[str, Optional[TransformResult]]) -> Dict[str, Dict[str, Any]]:
         """
         Load data for multiple stocks
         
@@ -227,6 +288,7 @@ class DataLoader:
         
         logger.info(f"Starting data loading for {len(transformed_data_dict)} stocks")
         
+        pending = {}
         for symbol, transformed_data in transformed_data_dict.items():
             if transformed_data is None:
                 logger.warning(f"Skipping loading for {symbol} - no transformed data")
@@ -234,44 +296,118 @@ class DataLoader:
                     'success': False,
                     'error': 'No transformed data available'
                 }
-                continue
-            
-            logger.info(f"Loading data for {symbol}...")
-            result = self.load_transformed_data(transformed_data)
-            loading_results[symbol] = result
+            else:
+                pending[symbol] = transformed_data
+        
+        # One existence check and insert for every stock up front, instead of one per symbol
+        stocks_loaded = False
+        if pending:
+            try:
+                self.ensure_stocks([transformed_data.stock for transformed_data in pending.values()])
+                stocks_loaded = True
+            except Exception as e:
+                logger.warning(f"Batched stock insert failed, loading stocks per symbol: {e}")
+        
+        # Large batches go out as one COPY; if that fails, symbols load one by one
+        if stocks_loaded and sum(len(td.price_records) for td in pending.values()) >= COPY_MIN_ROWS:
+            try:
+                loading_results.update(self._copy_batch(pending))
+                pending = {}
+            except Exception as e:
+                logger.warning(f"Bulk COPY of the batch failed, loading symbols individually: {e}")
         
+        # Symbols are independent, so they load in parallel, one transaction each
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.load_workers, len(pending)),
+                                    thread_name_prefix='etl-load') as executor:
+                futures = {
+                    executor.submit(self.load_transformed_data, transformed_data, stocks_loaded): symbol
+                    for symbol, transformed_data in pending.items()
+                }
+                for future in as_completed(futures):
+                    loading_results[futures[future]] = future.result()
+        
+        # Every symbol's job log goes out in one statement and commit
+        self.flush_job_logs()
+        
+        # One summary line per batch; per-symbol progress is logged at DEBUG
         successful_loads = sum(1 for result in loading_results.values() if result.get('success', False))
-        logger.info(f"Loading completed. {successful_loads}/{len(transformed_data_dict)} stocks successful")
+        prices_loaded = sum(result.get('prices_loaded', 0) for result in loading_results.values())
+        logger.info(f"Loading completed. {successful_loads}/{len(transformed_data_dict)} stocks successful, "
+                    f"{prices_loaded} price records loaded")
         
         return loading_results
     
+    def _copy_batch(self, pending: Dict[str, TransformResult]) -> Dict[str, Dict[str, Any]]:
+        """
+        Load every pending symbol's prices with one COPY, in one transaction
+        
+        The stocks must already exist (see ensure_stocks). Raises on failure,
+        in which case nothing is kept and no job is logged.
+        
+        Returns:
+            Loading results per symbol, shaped like load_transformed_data's
+        """
+        now = utc_now()
+        records = [record for transformed_data in pending.values() for record in transformed_data.price_records]
+        
+        with self.db_manager.transaction(synchronous_commit=False):
+            # Rows ordered as INTRADAY_COPY_COLUMNS
+            loaded = self.db_manager.bulk_copy_intraday(
+                (record.stock_symbol, record.timestamp, record.open_price, record.high_price,
+                 record.low_price, record.close_price, record.volume, record.interval, now)
+                for record in records
+            )
+            if loaded:
+                self.db_manager.mark_rollup_stale(min(record.timestamp for record in records))
+        
+        results = {}
+        for symbol, transformed_data in pending.items():
+            prices_loaded = loaded.get(symbol, 0)
+            self._log_etl_job(symbol, len(transformed_data.price_records), prices_loaded, 'SUCCESS', now=now)
+            results[symbol] = {
+                'success': True,
+                'symbol': symbol,
+                'stock_loaded': True,
+                'prices_loaded': prices_loaded,
+                'total_price_records': len(transformed_data.price_records),
+                'loading_timestamp': now.isoformat()
+            }
+        
+        logger.debug("Bulk COPY loaded %d price records for %d stocks", sum(loaded.values()), len(pending))
+        return results
+    
     def _log_etl_job(self, symbol: str, total_records: int, processed_records: int, 
-                     status: str, error_message: str = None):
-        """Log ETL job execution"""
+                     status: str, error_message: str = None, now: Optional[datetime] = None):
+        """Buffer an ETL job log row; written by flush_job_logs()"""
+        now = now or utc_now()
+        row = (
+            f"intraday_etl_{symbol}",
+            status,
+            now,  # Using same time for start/end in this case
+            now,
+            processed_records,
+            total_records,
+            error_message,
+            now
+        )
+        
+        with self._log_lock:
+            self._log_buffer.append(row)
+    
+    def flush_job_logs(self):
+        """Write all buffered ETL job log rows in a single multi-row INSERT"""
+        with self._log_lock:
+            rows, self._log_buffer = self._log_buffer, []
+        
+        if not rows:
+            return
+        
         try:
-            log_sql = """
-                INSERT INTO etl_job_logs 
-                (job_name, status, start_time, end_time, records_processed, 
-                 total_records, error_message, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            
-            now = datetime.utcnow()
-            params = (
-                f"intraday_etl_{symbol}",
-                status,
-                now,  # Using same time for start/end in this case
-                now,
-                processed_records,
-                total_records,
-                error_message,
-                now
-            )
-            
-            self.db_manager.execute_query(log_sql, params)
+            self.db_manager.execute_values_batch(_JOB_LOG_SQL, rows)
             
         except Exception as e:
-            logger.error(f"Failed to log ETL job: {e}")
+            logger.error(f"Failed to log {len(rows)} ETL jobs: {e}")
     
     def get_loading_stats(self, loading_results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """Get statistics about the loading process"""
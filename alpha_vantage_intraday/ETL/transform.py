@@ -5,27 +5,95 @@ Transforms raw API data into structured internal data models
 """
 
 import logging
+import os
+import re
+import sys
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from alpha_vantage_intraday.MODELS import Stock, StockPriceIntraday
+from .extract import OHLCV_GETTER, time_series_to_columns
 
 logger = logging.getLogger(__name__)
 
+# Optional JIT for the OHLCV validation ufunc; NumPy masks are used without it
+try:
+    import numba
+except ImportError:
+    numba = None
+
+MAX_REASONABLE_PRICE = 1000000.0
+
+if numba is not None:
+    @numba.vectorize(['boolean(float64, float64, float64, float64, int64)'], nopython=True, cache=True)
+    def ohlcv_valid(o, h, l, c, v):
+        """Compiled OHLCV consistency check; a NumPy ufunc, so it also applies to pandas Series"""
+        return (
+            o > 0 and h > 0 and l > 0 and c > 0
+            and v >= 0
+            and h >= max(o, c)
+            and l <= min(o, c)
+            and o <= MAX_REASONABLE_PRICE and h <= MAX_REASONABLE_PRICE
+            and l <= MAX_REASONABLE_PRICE and c <= MAX_REASONABLE_PRICE
+        )
+else:
+    def ohlcv_valid(o, h, l, c, v):
+        """NumPy OHLCV consistency check with the same semantics as the compiled ufunc"""
+        return (
+            (o > 0) & (h > 0) & (l > 0) & (c > 0)
+            & (v >= 0)
+            & (h >= np.maximum(o, c))
+            & (l <= np.minimum(o, c))
+            & (o <= MAX_REASONABLE_PRICE) & (h <= MAX_REASONABLE_PRICE)
+            & (l <= MAX_REASONABLE_PRICE) & (c <= MAX_REASONABLE_PRICE)
+        )
+
+# Alpha Vantage timestamp layouts: date, optionally followed by HH:MM[:SS]
+_TIMESTAMP_RE = re.compile(r'^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}(:\d{2})?)?$')
+
+# Optional C ISO-8601 parser; datetime.fromisoformat covers Alpha Vantage's formats otherwise
+try:
+    import ciso8601
+    _parse_iso_datetime = ciso8601.parse_datetime
+except ImportError:
+    _parse_iso_datetime = datetime.fromisoformat
+
+@dataclass(slots=True)
+class TransformResult:
+    """Transformed data for one symbol: its Stock and validated price records"""
+    stock: Stock
+    price_records: List[StockPriceIntraday]
+    symbol: str
+    interval: str
+    record_count: int
+    transformation_timestamp: str
+    api_metadata: Dict[str, Any]
+
 class DataTransformer:
     """Transforms raw API data into structured data models"""
     
     def __init__(self):
         self.supported_intervals = ['1min', '5min', '15min', '30min', '60min']
+        
+        # Stock objects depend only on the symbol, so build each one once
+        self._stock_cache: Dict[str, Stock] = {}
     
-    def transform_intraday_data(self, raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def transform_intraday_data(self, raw_data: Dict[str, Any]) -> Optional[TransformResult]:
         """
         Transform raw intraday data from Alpha Vantage API
         
+        raw_data follows the DataExtractor contract: 'time_series' is the
+        orjson-decoded payload (str timestamp keys mapping to dicts of str
+        OHLCV fields) and 'columns', when not None, holds the same bars as
+        NumPy arrays in the same order (see time_series_to_columns).
+        
         Args:
             raw_data: Raw data from DataExtractor
         
         Returns:
-            Transformed data with Stock and StockPriceIntraday objects
+            TransformResult with Stock and StockPriceIntraday objects
         """
         if not raw_data or 'time_series' not in raw_data:
             logger.error("Invalid raw data for transformation")
@@ -43,7 +111,7 @@ class DataTransformer:
             stock = self._create_stock_object(symbol, metadata)
             
             # Transform price data
-            price_records = self._create_price_objects(symbol, time_series, interval)
+            price_records = self._create_price_objects(symbol, time_series, interval, raw_data.get('columns'))
             
             if not price_records:
                 logger.warning(f"No valid price records found for {symbol}")
@@ -51,33 +119,115 @@ class DataTransformer:
             
             logger.info(f"Successfully transformed {len(price_records)} price records for {symbol}")
             
-            return {
-                'stock': stock,
-                'price_records': price_records,
-                'metadata': {
-                    'symbol': symbol,
-                    'interval': interval,
-                    'record_count': len(price_records),
-                    'transformation_timestamp': datetime.utcnow().isoformat(),
-                    'api_metadata': metadata
-                }
-            }
+            return TransformResult(
+                stock=stock,
+                price_records=price_records,
+                symbol=symbol,
+                interval=interval,
+                record_count=len(price_records),
+                transformation_timestamp=datetime.utcnow().isoformat(),
+                api_metadata=metadata
+            )
             
         except Exception as e:
             logger.error(f"Error transforming data for {raw_data.get('symbol', 'unknown')}: {e}")
             return None
     
     def _create_stock_object(self, symbol: str, metadata: Dict[str, Any]) -> Stock:
-        """Create a Stock object from symbol and metadata"""
-        return Stock(
-            symbol=symbol,
-            company_name=f"{symbol} Stock",  # Default company name, could be enhanced with company info API
-            exchange="NYSE",  # Default exchange, could be enhanced with lookup
-            is_active=True
-        )
+        """Create (or reuse the cached) Stock object for a symbol"""
+        stock = self._stock_cache.get(symbol)
+        if stock is None:
+            stock = self._stock_cache[symbol] = Stock(
+                symbol=symbol,
+                company_name=f"{symbol} Stock",  # Default company name, could be enhanced with company info API
+                exchange="NYSE",  # Default exchange, could be enhanced with lookup
+                is_active=True
+            )
+        return stock
     
-    def _create_price_objects(self, symbol: str, time_series: Dict[str, Any], interval: str) -> List[StockPriceIntraday]:
-        """Create StockPriceIntraday objects from time series data"""
+    def _create_price_objects(self, symbol: str, time_series: Dict[str, Any], interval: str,
+                              columns: Optional[Dict[str, np.ndarray]] = None) -> List[StockPriceIntraday]:
+        """
+        Create StockPriceIntraday objects from time series data
+        
+        OHLCV values are parsed and validated column-wise with NumPy; only
+        rows passing validation become objects. Payloads that can't be
+        converted column-wise (missing or non-numeric fields) fall back to
+        the per-row path.
+        """
+        # Every record (and every cycle) shares one symbol/interval string object
+        symbol = sys.intern(symbol)
+        interval = sys.intern(interval)
+        
+        if columns is None:
+            try:
+                columns = time_series_to_columns(time_series)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Columnar parse failed for {symbol}, falling back to per-row parsing: {e}")
+                return self._create_price_objects_rowwise(symbol, time_series, interval)
+        
+        opens, highs, lows, closes = columns['open'], columns['high'], columns['low'], columns['close']
+        volumes = columns['volume']
+        
+        mask = self._validate_price_columns(opens, highs, lows, closes, volumes)
+        
+        timestamp_strs = list(time_series)
+        for i in np.flatnonzero(~mask):
+            logger.warning(f"Invalid price data for {symbol} at {timestamp_strs[i]}, skipping")
+        
+        # tolist() yields native Python scalars the DB adapter understands;
+        # timestamps were batch-parsed to datetime64 and come out as datetime
+        valid = np.flatnonzero(mask)
+        timestamps = columns['timestamp'][valid]
+        unparsed = np.flatnonzero(np.isnat(timestamps))
+        timestamps = timestamps.tolist()
+        
+        if unparsed.size:
+            # Scalar fallback for anything the batch parse couldn't read
+            keep = np.ones(valid.shape[0], dtype=np.bool_)
+            for j in unparsed.tolist():
+                timestamp_str = timestamp_strs[valid[j]]
+                try:
+                    timestamps[j] = self._parse_timestamp(timestamp_str)
+                except ValueError as e:
+                    logger.warning(f"Error parsing price data for {symbol} at {timestamp_str}: {e}")
+                    keep[j] = False
+            if not keep.all():
+                valid = valid[keep]
+                timestamps = [timestamp for timestamp, kept in zip(timestamps, keep.tolist()) if kept]
+        
+        # Only rows that survived validation are materialized, in one comprehension
+        price_records = [
+            StockPriceIntraday(
+                stock_symbol=symbol,
+                timestamp=timestamp,
+                open_price=open_price,
+                high_price=high_price,
+                low_price=low_price,
+                close_price=close_price,
+                volume=volume,
+                interval=interval
+            )
+            for timestamp, open_price, high_price, low_price, close_price, volume in zip(
+                timestamps, opens[valid].tolist(), highs[valid].tolist(),
+                lows[valid].tolist(), closes[valid].tolist(), volumes[valid].tolist())
+        ]
+        
+        return price_records
+    
+    @staticmethod
+    def _validate_price_columns(opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                                closes: np.ndarray, volumes: np.ndarray) -> np.ndarray:
+        """Vectorized _validate_price_data: boolean mask of consistent OHLCV rows"""
+        return ohlcv_valid(opens, highs, lows, closes, volumes)
+    
+    def _create_price_objects_rowwise(self, symbol: str, time_series: Dict[str, Any], interval: str) -> List[StockPriceIntraday]:
+        """
+        Create StockPriceIntraday objects one row at a time, skipping malformed rows
+        
+        Missing OHLCV fields raise KeyError and the row is logged and skipped;
+        they are not zero-filled and left for validation to reject.
+        """
         price_records = []
         
         for timestamp_str, price_data in time_series.items():
@@ -85,12 +235,13 @@ class DataTransformer:
                 # Parse timestamp (Alpha Vantage format: "2024-01-15 16:00:00")
                 timestamp = self._parse_timestamp(timestamp_str)
                 
-                # Extract OHLCV data
-                open_price = float(price_data.get('1. open', 0))
-                high_price = float(price_data.get('2. high', 0))
-                low_price = float(price_data.get('3. low', 0))
-                close_price = float(price_data.get('4. close', 0))
-                volume = int(price_data.get('5. volume', 0))
+                # Extract OHLCV data (a missing field fails the row like an invalid value)
+                open_str, high_str, low_str, close_str, volume_str = OHLCV_GETTER(price_data)
+                open_price = float(open_str)
+                high_price = float(high_str)
+                low_price = float(low_str)
+                close_price = float(close_str)
+                volume = int(volume_str)
                 
                 # Validate data
                 if not self._validate_price_data(open_price, high_price, low_price, close_price, volume):
@@ -111,7 +262,7 @@ class DataTransformer:
                 
                 price_records.append(price_record)
                 
-            except (ValueError, TypeError) as e:
+            except (KeyError, ValueError, TypeError) as e:
                 logger.warning(f"Error parsing price data for {symbol} at {timestamp_str}: {e}")
                 continue
             except Exception as e:
@@ -123,20 +274,12 @@ class DataTransformer:
     def _parse_timestamp(self, timestamp_str: str) -> datetime:
         """Parse Alpha Vantage timestamp string to datetime object"""
         try:
-            # Handle different timestamp formats
-            timestamp_formats = [
-                "%Y-%m-%d %H:%M:%S",  # "2024-01-15 16:00:00"
-                "%Y-%m-%d %H:%M",     # "2024-01-15 16:00"
-                "%Y-%m-%d"            # "2024-01-15"
-            ]
-            
-            for fmt in timestamp_formats:
-                try:
-                    return datetime.strptime(timestamp_str, fmt)
-                except ValueError:
-                    continue
+            # "2024-01-15 16:00:00", "2024-01-15 16:00" and "2024-01-15" are all
+            # ISO-8601, so one regex check picks the parser without trial and error
+            if isinstance(timestamp_str, str) and _TIMESTAMP_RE.match(timestamp_str):
+                return _parse_iso_datetime(timestamp_str)
             
-            # If no format matches, try parsing with dateutil (more flexible)
+            # If no known format matches, try parsing with dateutil (more flexible)
             from dateutil import parser
             return parser.parse(timestamp_str)
             
@@ -167,10 +310,13 @@ class DataTransformer:
         
         return True
     
-    def transform_multiple_stocks(self, raw_data_dict: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, Optional[Dict[str, Any]]]:
+    def transform_multiple_stocks(self, raw_data_dict: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, Optional[TransformResult]]:
         """
         Transform data for multiple stocks
         
+        Symbols are transformed concurrently on a thread pool; the NumPy
+        (and optional numba) kernels release the GIL while they run.
+        
         Args:
             raw_data_dict: Dictionary mapping symbols to raw data
         
@@ -181,6 +327,7 @@ class DataTransformer:
         
         logger.info(f"Starting transformation for {len(raw_data_dict)} stocks")
         
+        pending = {}
         for symbol, raw_data in raw_data_dict.items():
             if raw_data is None:
                 logger.warning(f"Skipping transformation for {symbol} - no raw data")
@@ -188,24 +335,37 @@ class DataTransformer:
                 continue
             
             logger.info(f"Transforming data for {symbol}...")
-            transformed_data = self.transform_intraday_data(raw_data)
-            transformed_results[symbol] = transformed_data
+            pending[symbol] = raw_data
+        
+        if len(pending) > 1:
+            max_workers = min(32, os.cpu_count() or 1, len(pending))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                transformed_results.update(zip(pending, executor.map(self.transform_intraday_data, pending.values())))
+        else:
+            for symbol, raw_data in pending.items():
+                transformed_results[symbol] = self.transform_intraday_data(raw_data)
+        
+        # Preserve the caller's symbol order
+        transformed_results = {symbol: transformed_results[symbol] for symbol in raw_data_dict}
         
         successful_transformations = sum(1 for data in transformed_results.values() if data is not None)
         logger.info(f"Transformation completed. {successful_transformations}/{len(raw_data_dict)} stocks successful")
         
         return transformed_results
     
-    def get_transformation_stats(self, transformed_data: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    def get_transformation_stats(self, transformed_data: Dict[str, Optional[TransformResult]]) -> Dict[str, Any]:
         """Get statistics about the transformation process"""
         total_symbols = len(transformed_data)
-        successful_symbols = sum(1 for data in transformed_data.values() if data is not None)
-        failed_symbols = total_symbols - successful_symbols
-        
+        successful_symbols = 0
         total_records = 0
+        
+        # Single pass over the results
         for data in transformed_data.values():
-            if data and 'price_records' in data:
-                total_records += len(data['price_records'])
+            if data is not None:
+                successful_symbols += 1
+                total_records += data.record_count
+        
+        failed_symbols = total_symbols - successful_symbols
         
         return {
             'total_symbols': total_symbols,
@@ -9,8 +9,9 @@ import time
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from threading import Event
 
-from alpha_vantage_intraday.intraday_pipeline import ETLService
+from alpha_vantage_intraday.intraday_pipeline import ETLService, DEFAULT_SYMBOLS
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +29,17 @@ class PollingConfig:
 class PollingManager:
     """Manages different polling strategies for data ingestion"""
     
-    def __init__(self):
-        self.etl_service = ETLService()
-
+    def __init__(self, etl_service: Optional[ETLService] = None):
+        # Callers running several components should pass the same service
+        self.etl_service = etl_service or ETLService.get()
+        # Set by stop() to end a running polling loop without waiting out its sleep
+        self.stop_event = Event()
+    
+    def stop(self):
+        """Request that the running polling loop exit"""
+        self.stop_event.set()
+    
+    DEFAULT_SYMBOLS = DEFAULT_SYMBOLS  # Default symbols for polling
     
     def continuous_polling(self, config: PollingConfig) -> Dict[str, Any]:
         """
@@ -45,7 +54,7 @@ class PollingManager:
         logger.info(f"Starting continuous polling with interval: {config.interval_minutes} minutes")
         
         if config.symbols is None:
-            config.symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]  # Default symbols for continuous polling
+            config.symbols = list(self.DEFAULT_SYMBOLS)
         
         iteration = 0
         total_records = 0
@@ -53,6 +62,7 @@ class PollingManager:
         failed_cycles = 0
         
         start_time = datetime.utcnow()
+        self.stop_event.clear()
         
         try:
             while True:
@@ -62,39 +72,26 @@ class PollingManager:
                 
                 iteration += 1
                 cycle_start = datetime.utcnow()
+                # Cycles start on a fixed cadence, so work time doesn't push later cycles back
+                deadline = time.monotonic() + config.interval_minutes * 60
                 
                 logger.info(f"=== Polling Cycle {iteration} at {cycle_start} ===")
                 
-                # Process symbols in batches
-                batch_results = self._process_symbols_in_batches(
-                    config.symbols, 
-                    config.interval, 
-                    config.batch_size
-                )
-                
-                # Calculate cycle statistics
-                cycle_records = sum(batch_results.values())
+                cycle_records = self._run_polling_cycle(config, iteration, log_symbols=True)
                 total_records += cycle_records
-                cycle_time = datetime.utcnow() - cycle_start
-                
                 if cycle_records > 0:
                     successful_cycles += 1
-                    logger.info(f"Cycle {iteration} successful: {cycle_records} records in {cycle_time}")
                 else:
                     failed_cycles += 1
-                    logger.warning(f"Cycle {iteration} failed: no records processed")
-                
-                # Log individual symbol results
-                for symbol, count in batch_results.items():
-                    if count > 0:
-                        logger.info(f"  {symbol}: {count} records")
                 
                 # Calculate next cycle time
                 next_cycle = cycle_start + timedelta(minutes=config.interval_minutes)
                 logger.info(f"Next cycle scheduled for: {next_cycle}")
                 
-                # Wait for next cycle
-                time.sleep(config.interval_minutes * 60)
+                # Wait for next cycle (returns early if stop() is called)
+                if self._wait_until(deadline):
+                    logger.info("Continuous polling stopped")
+                    break
                 
         except KeyboardInterrupt:
             logger.info("Continuous polling interrupted by user")
@@ -102,6 +99,45 @@ class PollingManager:
             logger.error(f"Error in continuous polling: {e}")
             failed_cycles += 1
         
+        return self._polling_results(iteration, successful_cycles, failed_cycles, total_records, start_time)
+    
+    def _wait_until(self, deadline: float) -> bool:
+        """Wait until a time.monotonic() deadline; True if stop() was called meanwhile"""
+        return self.stop_event.wait(max(0.0, deadline - time.monotonic()))
+    
+    def _run_polling_cycle(self, config: PollingConfig, iteration: int, log_symbols: bool = False) -> int:
+        """Process one polling cycle and log its outcome; returns records processed"""
+        # Durations use the monotonic clock; wall-clock time is only read at cycle boundaries
+        cycle_t0 = time.monotonic()
+        
+        # Process symbols in batches
+        batch_results = self._process_symbols_in_batches(
+            config.symbols, 
+            config.interval, 
+            config.batch_size
+        )
+        
+        # Calculate cycle statistics
+        cycle_records = sum(batch_results.values())
+        cycle_time = time.monotonic() - cycle_t0
+        
+        if cycle_records > 0:
+            logger.info(f"Cycle {iteration} successful: {cycle_records} records in {cycle_time:.2f}s")
+        else:
+            logger.warning(f"Cycle {iteration} failed: no records processed")
+        
+        # Log individual symbol results
+        if log_symbols:
+            for symbol, count in batch_results.items():
+                if count > 0:
+                    logger.info(f"  {symbol}: {count} records")
+        
+        return cycle_records
+    
+    @staticmethod
+    def _polling_results(iteration: int, successful_cycles: int, failed_cycles: int,
+                         total_records: int, start_time: datetime) -> Dict[str, Any]:
+        """Build the summary returned by the polling strategies"""
         end_time = datetime.utcnow()
         total_duration = end_time - start_time
         
@@ -143,6 +179,14 @@ class PollingManager:
         
         return all_results
     
+    @staticmethod
+    def _seconds_until_market_open(current_time: datetime, market_open_hour: int) -> float:
+        """Seconds from current_time until the next market open hour"""
+        next_open = current_time.replace(hour=market_open_hour, minute=0, second=0, microsecond=0)
+        if next_open <= current_time:
+            next_open += timedelta(days=1)
+        return (next_open - current_time).total_seconds()
+    
     def market_hours_polling(self, 
                            config: PollingConfig,
                            market_open_hour: int = 9,
@@ -161,7 +205,7 @@ class PollingManager:
         logger.info(f"Starting market hours polling ({market_open_hour}:00 - {market_close_hour}:00)")
         
         if config.symbols is None:
-            config.symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]  # Default symbols for market hours polling
+            config.symbols = list(self.DEFAULT_SYMBOLS)
         
         iteration = 0
         total_records = 0
@@ -169,6 +213,7 @@ class PollingManager:
         failed_cycles = 0
         
         start_time = datetime.utcnow()
+        self.stop_event.clear()
         
         try:
             while True:
@@ -176,39 +221,36 @@ class PollingManager:
                     logger.info(f"Reached maximum iterations ({config.max_iterations})")
                     break
                 
-                current_hour = datetime.utcnow().hour
+                # Read the clock once per iteration and reuse it below
+                now = datetime.utcnow()
+                current_hour = now.hour
                 
                 # Check if market is open
                 if market_open_hour <= current_hour < market_close_hour:
                     iteration += 1
-                    cycle_start = datetime.utcnow()
+                    cycle_start = now
+                    deadline = time.monotonic() + config.interval_minutes * 60
                     
                     logger.info(f"=== Market Hours Polling Cycle {iteration} at {cycle_start} ===")
                     
-                    # Process symbols
-                    batch_results = self._process_symbols_in_batches(
-                        config.symbols, 
-                        config.interval, 
-                        config.batch_size
-                    )
-                    
-                    cycle_records = sum(batch_results.values())
+                    cycle_records = self._run_polling_cycle(config, iteration)
                     total_records += cycle_records
-                    cycle_time = datetime.utcnow() - cycle_start
-                    
                     if cycle_records > 0:
                         successful_cycles += 1
-                        logger.info(f"Cycle {iteration} successful: {cycle_records} records in {cycle_time}")
                     else:
                         failed_cycles += 1
-                        logger.warning(f"Cycle {iteration} failed: no records processed")
                     
-                    # Wait for next cycle
-                    time.sleep(config.interval_minutes * 60)
+                    # Wait for next cycle (returns early if stop() is called)
+                    if self._wait_until(deadline):
+                        logger.info("Market hours polling stopped")
+                        break
                 else:
-                    # Market is closed, wait longer
-                    logger.info(f"Market closed (current hour: {current_hour}), waiting...")
-                    time.sleep(30 * 60)  # Wait 30 minutes
+                    # Market is closed, sleep straight through to the next open
+                    wait_seconds = self._seconds_until_market_open(now, market_open_hour)
+                    logger.info(f"Market closed (current hour: {current_hour}), waiting {wait_seconds / 60:.0f} minutes until open...")
+                    if self.stop_event.wait(wait_seconds):
+                        logger.info("Market hours polling stopped")
+                        break
                     
         except KeyboardInterrupt:
             logger.info("Market hours polling interrupted by user")
@@ -216,19 +258,7 @@ class PollingManager:
             logger.error(f"Error in market hours polling: {e}")
             failed_cycles += 1
         
-        end_time = datetime.utcnow()
-        total_duration = end_time - start_time
-        
-        return {
-            'total_iterations': iteration,
-            'successful_cycles': successful_cycles,
-            'failed_cycles': failed_cycles,
-            'total_records_processed': total_records,
-            'start_time': start_time.isoformat(),
-            'end_time': end_time.isoformat(),
-            'total_duration': str(total_duration),
-            'success_rate': (successful_cycles / iteration * 100) if iteration > 0 else 0,
-            'market_hours': f"{market_open_hour}:00-{market_close_hour}:00"
-        }
+        results = self._polling_results(iteration, successful_cycles, failed_cycles, total_records, start_time)
+        results['market_hours'] = f"{market_open_hour}:00-{market_close_hour}:00"
+        return results
     
-
@@ -4,6 +4,8 @@ Data Streaming Service for Real-time Stock Data Ingestion
 Simulates real-time ingestion through periodic polling
 """
 
+import asyncio
+import queue
 import time
 import logging
 import signal
@@ -12,22 +14,26 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any, Callable
 from threading import Thread, Event
 
-from alpha_vantage_intraday.intraday_pipeline import ETLService
+from alpha_vantage_intraday.intraday_pipeline import ETLService, DEFAULT_SYMBOLS
 
 logger = logging.getLogger(__name__)
 
 class DataStreamingService:
     """Main service for real-time data streaming simulation"""
     
-    def __init__(self):
-        self.etl_service = ETLService()
+    def __init__(self, etl_service: Optional[ETLService] = None):
+        # Callers running several components should pass the same service
+        self.etl_service = etl_service or ETLService.get()
         self.is_running = False
         self.stop_event = Event()
         self.streaming_thread = None
         
-
-        
-        # Signal handlers for graceful shutdown
+        # Loads and callbacks run on a writer thread so DB latency never delays the next poll
+        self._writer_q = queue.Queue(maxsize=1024)
+        self._writer_thread = None
+    
+    def install_signal_handlers(self):
+        """Register SIGINT/SIGTERM handlers for graceful shutdown (main thread only)"""
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
     
@@ -59,11 +65,15 @@ class DataStreamingService:
             return False
         
         if symbols is None:
-            symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]  # Default symbols for streaming
+            symbols = DEFAULT_SYMBOLS
         
         self.is_running = True
         self.stop_event.clear()
         
+        if self._writer_thread is None or not self._writer_thread.is_alive():
+            self._writer_thread = Thread(target=self._writer_loop, daemon=True)
+            self._writer_thread.start()
+        
         # Start streaming in a separate thread
         self.streaming_thread = Thread(
             target=self._streaming_worker,
@@ -90,28 +100,24 @@ class DataStreamingService:
                     break
                 
                 start_time = datetime.utcnow()
+                cycle_t0 = time.monotonic()
                 iteration += 1
                 
                 logger.info(f"=== Streaming Cycle {iteration} at {start_time} ===")
                 
-                # Process all symbols in the current cycle
+                # Extract and transform here; loading is handed to the writer thread
                 try:
-                    results = self.etl_service.process_multiple_stocks_intraday(symbols, "5min")
-                    total_processed = sum(results.values())
-                    
-                    cycle_time = datetime.utcnow() - start_time
-                    logger.info(f"Cycle {iteration} completed in {cycle_time}. Records processed: {total_processed}")
-                    
-                    # Log individual results
-                    for symbol, count in results.items():
-                        logger.info(f"  {symbol}: {count} records")
+                    raw_data_dict = asyncio.run(
+                        self.etl_service.extractor.extract_multiple_stocks_async(symbols, "5min")
+                    )
+                    transformed_data_dict = self.etl_service.transformer.transform_multiple_stocks(raw_data_dict)
                     
-                    # Execute callback if provided
-                    if callback:
-                        try:
-                            callback(iteration, results, cycle_time)
-                        except Exception as e:
-                            logger.error(f"Callback execution failed: {e}")
+                    batch = (iteration, cycle_t0, transformed_data_dict, callback)
+                    try:
+                        self._writer_q.put_nowait(batch)
+                    except queue.Full:
+                        logger.warning(f"Writer queue full, cycle {iteration} waiting for pending loads")
+                        self._writer_q.put(batch)
                     
                 except Exception as e:
                     logger.error(f"Error in streaming cycle {iteration}: {e}")
@@ -120,12 +126,9 @@ class DataStreamingService:
                 next_run = start_time + timedelta(minutes=interval_minutes)
                 logger.info(f"Next streaming cycle scheduled for: {next_run}")
                 
-                # Wait for next cycle (with early termination check)
-                wait_seconds = interval_minutes * 60
-                for _ in range(wait_seconds):
-                    if self.stop_event.is_set():
-                        break
-                    time.sleep(1)
+                # Wait out the rest of the interval, measured from the cycle start so
+                # work time doesn't drift the cadence; returns immediately on stop
+                self.stop_event.wait(timeout=max(0.0, cycle_t0 + interval_minutes * 60 - time.monotonic()))
                 
         except Exception as e:
             logger.error(f"Unexpected error in streaming worker: {e}")
@@ -133,10 +136,79 @@ class DataStreamingService:
             self.is_running = False
             logger.info("Streaming worker stopped")
     
+    def _writer_loop(self):
+        """Writer thread: load transformed cycles into the database and run callbacks"""
+        while True:
+            batch = self._writer_q.get()
+            if batch is None:
+                break
+            
+            iteration, cycle_t0, transformed_data_dict, callback = batch
+            try:
+                self.etl_service.ensure_partitions()
+                loading_results = self.etl_service.loader.load_multiple_stocks(transformed_data_dict)
+                
+                results = {}
+                for symbol, transformed_data in transformed_data_dict.items():
+                    if transformed_data is None:
+                        self.etl_service._log_etl_job(symbol, 0, 0, 'FAILED', 'Extraction or transformation failed')
+                    result = loading_results.get(symbol, {})
+                    results[symbol] = result.get('prices_loaded', 0) if result.get('success', False) else 0
+                self.etl_service.flush_job_logs()
+                
+                total_processed = sum(results.values())
+                # Callbacks still receive a timedelta, measured on the monotonic clock
+                cycle_time = timedelta(seconds=time.monotonic() - cycle_t0)
+                logger.info(f"Cycle {iteration} completed in {cycle_time}. Records processed: {total_processed}")
+                
+                # Log individual results
+                for symbol, count in results.items():
+                    logger.info(f"  {symbol}: {count} records")
+                
+                # Execute callback if provided
+                if callback:
+                    try:
+                        callback(iteration, results, cycle_time)
+                    except Exception as e:
+                        logger.error(f"Callback execution failed: {e}")
+                
+            except Exception as e:
+                logger.error(f"Error loading streaming cycle {iteration}: {e}")
+            finally:
+                self._writer_q.task_done()
+        
+        logger.info("Streaming writer stopped")
+    
+    def _stop_writer(self):
+        """Let the writer drain queued cycles, then stop it"""
+        # The stop sentinel must be the last thing queued, so while the streaming
+        # thread may still queue a cycle the writer is left running to load it
+        if self.streaming_thread and self.streaming_thread.is_alive():
+            logger.warning("Streaming thread is still finishing a cycle; writer left running to load it")
+            return
+        
+        if self._writer_thread and self._writer_thread.is_alive():
+            self._writer_q.put(None)
+            self._writer_thread.join(timeout=30)
+            if self._writer_thread.is_alive():
+                logger.warning(f"Streaming writer still loading after 30s, {self._writer_q.qsize()} cycles pending")
+                return
+        
+        # Anything still queued now has no writer left to load it
+        while True:
+            try:
+                batch = self._writer_q.get_nowait()
+            except queue.Empty:
+                break
+            self._writer_q.task_done()
+            if batch is not None:
+                logger.warning(f"Dropped streaming cycle {batch[0]} ({len(batch[2])} symbols) queued after the writer stopped")
+    
     def stop_streaming(self) -> bool:
         """Stop the streaming service"""
         if not self.is_running:
             logger.info("Streaming service is not running")
+            self._stop_writer()
             return True
         
         logger.info("Stopping streaming service...")
@@ -147,6 +219,8 @@ class DataStreamingService:
         if self.streaming_thread and self.streaming_thread.is_alive():
             self.streaming_thread.join(timeout=10)
         
+        self._stop_writer()
+        
         logger.info("Streaming service stopped")
         return True
     
@@ -156,6 +230,7 @@ class DataStreamingService:
             'is_running': self.is_running,
             'stop_event_set': self.stop_event.is_set(),
             'thread_alive': self.streaming_thread.is_alive() if self.streaming_thread else False,
+            'pending_writes': self._writer_q.qsize(),
             'timestamp': datetime.utcnow().isoformat()
         }
     
@@ -164,13 +239,13 @@ class DataStreamingService:
                          callback: Optional[Callable] = None) -> Dict[str, int]:
         """Run a single streaming cycle"""
         if symbols is None:
-            symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]  # Default symbols for single cycle
+            symbols = DEFAULT_SYMBOLS
         
         logger.info(f"Running single streaming cycle for {len(symbols)} symbols")
         
-        start_time = datetime.utcnow()
+        cycle_t0 = time.monotonic()
         results = self.etl_service.process_multiple_stocks_intraday(symbols, "5min")
-        cycle_time = datetime.utcnow() - start_time
+        cycle_time = timedelta(seconds=time.monotonic() - cycle_t0)
         
         total_processed = sum(results.values())
         logger.info(f"Single cycle completed in {cycle_time}. Records processed: {total_processed}")
@@ -4,22 +4,128 @@ Intraday Pipeline Module for Stock Data Processing
 Orchestrates the Extract, Transform, and Load operations
 """
 
+import asyncio
 import logging
+import aiohttp
 import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+from datetime import datetime, timezone
+from dataclasses import dataclass
 
 from alpha_vantage_intraday.ETL import DataExtractor, DataTransformer, DataLoader
 from alpha_vantage_intraday.DB import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+_INSTANCE: Optional["ETLService"] = None
+_INSTANCE_LOCK = threading.Lock()
+
+# Symbols streamed and polled when the caller names none
+DEFAULT_SYMBOLS = ("AAPL", "MSFT", "GOOGL", "AMZN", "TSLA")
+
+# Seconds between checks that upcoming monthly partitions exist (see ensure_partitions)
+PARTITION_CHECK_INTERVAL = 3600
+
+# Symbols transformed concurrently by run_etl_pipeline
+TRANSFORM_WORKERS = min(4, os.cpu_count() or 1)
+
+# Per-process transformer used by ProcessPoolExecutor workers
+_WORKER_TRANSFORMER: Optional[DataTransformer] = None
+
+def _transform_in_worker(raw_data: Dict[str, Any]):
+    """Transform one symbol in a pool process (top-level so it pickles by reference)"""
+    global _WORKER_TRANSFORMER
+    if _WORKER_TRANSFORMER is None:
+        _WORKER_TRANSFORMER = DataTransformer()
+    return _WORKER_TRANSFORMER.transform_intraday_data(raw_data)
+
+# Recent job statistics for get_etl_status, run as a server-side prepared statement
+_STATUS_STATEMENT = 'etl_recent_status'
+_STATUS_SQL = """
+    SELECT 
+        COUNT(*) as total_jobs,
+        COUNT(*) FILTER (WHERE status = 'SUCCESS') as successful_jobs,
+        COUNT(*) FILTER (WHERE status = 'FAILED') as failed_jobs,
+        COUNT(*) FILTER (WHERE status = 'RUNNING') as running_jobs,
+        MAX(start_time) as last_run
+    FROM etl_job_logs 
+    WHERE created_at >= NOW() - INTERVAL '7 days'
+"""
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code
+    
+    asyncio.run() raises RuntimeError when this thread already runs an event
+    loop (Jupyter, FastAPI handlers, other async callers), so in that case the
+    coroutine gets its own loop on a worker thread and this call blocks until
+    it is done. Async callers should await the coroutine directly instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+def _percent(part: int, whole: int) -> float:
+    """part as a percentage of whole (0 when whole is 0)"""
+    return (part / whole * 100) if whole > 0 else 0
+
+@dataclass(slots=True)
+class PipelineCounters:
+    """Running per-phase totals for run_etl_pipeline, updated as each symbol moves through"""
+    total_symbols: int = 0
+    extracted: int = 0
+    data_points: int = 0
+    transformed: int = 0
+    transformed_records: int = 0
+    loaded: int = 0
+    loaded_price_records: int = 0
+    loaded_records: int = 0
+    
+    def extraction_stats(self) -> Dict[str, Any]:
+        """Extraction phase statistics"""
+        return {
+            'total_symbols': self.total_symbols,
+            'successful_extractions': self.extracted,
+            'failed_extractions': self.total_symbols - self.extracted,
+            'total_data_points': self.data_points,
+            'success_rate': _percent(self.extracted, self.total_symbols)
+        }
+    
+    def transformation_stats(self) -> Dict[str, Any]:
+        """Same shape as DataTransformer.get_transformation_stats()"""
+        return {
+            'total_symbols': self.total_symbols,
+            'successful_symbols': self.transformed,
+            'failed_symbols': self.total_symbols - self.transformed,
+            'total_price_records': self.transformed_records,
+            'success_rate': _percent(self.transformed, self.total_symbols)
+        }
+    
+    def loading_stats(self) -> Dict[str, Any]:
+        """Same shape as DataLoader.get_loading_stats()"""
+        return {
+            'total_symbols': self.total_symbols,
+            'successful_symbols': self.loaded,
+            'failed_symbols': self.total_symbols - self.loaded,
+            'total_price_records': self.loaded_price_records,
+            'total_loaded_records': self.loaded_records,
+            'success_rate': _percent(self.loaded, self.total_symbols),
+            'loading_efficiency': _percent(self.loaded_records, self.loaded_price_records)
+        }
+
 class ETLService:
     """Main ETL service that orchestrates the ETL pipeline"""
     
     def __init__(self):
-        # Initialize database manager
-        self.db_manager = DatabaseManager()
+        # Share the process-wide database manager and its connection pool
+        self.db_manager = DatabaseManager.get()
+        self.db_manager.register_prepared(_STATUS_STATEMENT, _STATUS_SQL)
         
         # Initialize ETL components
         api_key = os.getenv('ALPHA_VANTAGE_API_KEY')
@@ -27,15 +133,56 @@ class ETLService:
             logger.warning("ALPHA_VANTAGE_API_KEY not found in environment variables")
             api_key = "demo"  # Fallback to demo key for testing
         
-        self.extractor = DataExtractor(api_key)
+        calls_per_minute = int(os.getenv('ALPHA_VANTAGE_CALLS_PER_MINUTE', '5'))
+        bulk_batch_size = int(os.getenv('BULK_BATCH_SIZE', '1000'))
+        # 0 keeps transforms on threads; >0 runs run_etl_pipeline transforms in that many processes
+        self.transform_processes = int(os.getenv('TRANSFORM_PROCESSES', '0'))
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        
+        self.extractor = DataExtractor(api_key, calls_per_minute=calls_per_minute)
         self.transformer = DataTransformer()
-        self.loader = DataLoader(self.db_manager)
+        load_workers = int(os.getenv('LOAD_WORKERS', '8'))
+        self.loader = DataLoader(self.db_manager, batch_size=bulk_batch_size, load_workers=load_workers)
+        
+        # Monotonic time the next partition check is due
+        self._partitions_due = 0.0
+        self._partitions_lock = threading.Lock()
+    
+    @classmethod
+    def get(cls) -> "ETLService":
+        """Return the process-wide ETLService, sharing its HTTP session and rate limiter"""
+        global _INSTANCE
+        if _INSTANCE is None:
+            with _INSTANCE_LOCK:
+                if _INSTANCE is None:
+                    _INSTANCE = cls()
+        return _INSTANCE
     
     def _ensure_db_connection(self):
         """Ensure database connection pool is initialized"""
         if not self.db_manager.connection_pool:
             self.db_manager.init_connection_pool()
     
+    def ensure_partitions(self, force: bool = False):
+        """
+        Pre-create upcoming monthly partitions of stock_prices_intraday
+        
+        Every load path calls this, so a long-running process keeps creating
+        months before bars for them arrive (rows landing in the default
+        partition would block that month's partition). Checks at most once
+        per PARTITION_CHECK_INTERVAL unless forced; failures only warn.
+        """
+        now = time.monotonic()
+        with self._partitions_lock:
+            if not force and now < self._partitions_due:
+                return
+            self._partitions_due = now + PARTITION_CHECK_INTERVAL
+        
+        try:
+            self.db_manager.ensure_intraday_partitions()
+        except Exception as e:
+            logger.warning(f"Partition maintenance failed: {e}")
+    
     def process_stock_intraday(self, symbol: str, interval: str = "5min") -> int:
         """
         Process a single stock through the complete ETL pipeline
@@ -48,13 +195,15 @@ class ETLService:
             Number of price records processed
         """
         try:
-            logger.info(f"Starting ETL pipeline for {symbol} with {interval} interval")
+            logger.info("Starting ETL pipeline for %s with %s interval", symbol, interval)
             
             # Ensure database connection is available
             self._ensure_db_connection()
+            self.ensure_partitions()
             
             # Step 1: Extract data from API
-            logger.info(f"Step 1: Extracting data for {symbol}")
+            # Per-symbol logging uses %-style args so nothing is formatted below INFO
+            logger.info("Step 1: Extracting data for %s", symbol)
             raw_data = self.extractor.extract_intraday_data(symbol, interval)
             
             if not raw_data:
@@ -62,37 +211,79 @@ class ETLService:
                 self._log_etl_job(symbol, 0, 0, 'FAILED', 'Extraction failed')
                 return 0
             
-            # Step 2: Transform raw data
-            logger.info(f"Step 2: Transforming data for {symbol}")
-            transformed_data = self.transformer.transform_intraday_data(raw_data)
+            return self._transform_and_load(symbol, raw_data)
             
-            if not transformed_data:
-                logger.error(f"Transformation failed for {symbol}")
-                self._log_etl_job(symbol, 0, 0, 'FAILED', 'Transformation failed')
-                return 0
-            
-            # Step 3: Load data into database
-            logger.info(f"Step 3: Loading data for {symbol}")
-            loading_result = self.loader.load_transformed_data(transformed_data)
+        except Exception as e:
+            logger.error(f"ETL pipeline failed for {symbol}: {e}")
+            self._log_etl_job(symbol, 0, 0, 'FAILED', str(e))
+            return 0
+        finally:
+            self.flush_job_logs()
+    
+    def _transform_and_load(self, symbol: str, raw_data: Dict[str, Any]) -> int:
+        """Transform and load one symbol's extracted data; returns records processed"""
+        # Step 2: Transform raw data
+        logger.info("Step 2: Transforming data for %s", symbol)
+        transformed_data = self.transformer.transform_intraday_data(raw_data)
+        
+        if not transformed_data:
+            logger.error(f"Transformation failed for {symbol}")
+            self._log_etl_job(symbol, 0, 0, 'FAILED', 'Transformation failed')
+            return 0
+        
+        # Step 3: Load data into database
+        logger.info("Step 3: Loading data for %s", symbol)
+        loading_result = self.loader.load_transformed_data(transformed_data)
+        
+        if not loading_result.get('success', False):
+            logger.error(f"Loading failed for {symbol}: {loading_result.get('error', 'Unknown error')}")
+            return 0
+        
+        records_processed = loading_result.get('prices_loaded', 0)
+        logger.info("ETL pipeline completed for %s. Records processed: %d", symbol, records_processed)
+        
+        return records_processed
+    
+    async def _process_stock_async(self, session: aiohttp.ClientSession, symbol: str, interval: str,
+                                   semaphore: asyncio.Semaphore) -> int:
+        """Extract one symbol on the event loop, then transform and load it on a worker thread"""
+        try:
+            raw_data = await self.extractor.extract_intraday_data_async(session, symbol, interval, semaphore)
             
-            if not loading_result.get('success', False):
-                logger.error(f"Loading failed for {symbol}: {loading_result.get('error', 'Unknown error')}")
+            if not raw_data:
+                logger.error(f"Extraction failed for {symbol}")
+                self._log_etl_job(symbol, 0, 0, 'FAILED', 'Extraction failed')
                 return 0
             
-            records_processed = loading_result.get('prices_loaded', 0)
-            logger.info(f"ETL pipeline completed for {symbol}. Records processed: {records_processed}")
-            
-            return records_processed
+            return await asyncio.to_thread(self._transform_and_load, symbol, raw_data)
             
         except Exception as e:
             logger.error(f"ETL pipeline failed for {symbol}: {e}")
             self._log_etl_job(symbol, 0, 0, 'FAILED', str(e))
             return 0
     
+    async def _process_multiple_stocks_async(self, symbols: List[str], interval: str) -> List[Any]:
+        """Run every symbol's pipeline concurrently, bounded by the extractor's request limit"""
+        semaphore = asyncio.Semaphore(self.extractor.max_concurrent_requests)
+        
+        async with self.extractor.client_session() as session:
+            return await asyncio.gather(
+                *[self._process_stock_async(session, symbol, interval, semaphore) for symbol in symbols],
+                return_exceptions=True
+            )
+    
     def process_multiple_stocks_intraday(self, symbols: List[str], interval: str = "5min") -> Dict[str, int]:
         """
         Process multiple stocks through the ETL pipeline
         
+        Extracts run concurrently (paced by the extractor's rate limiter) and
+        each symbol is transformed and loaded as soon as its own extract
+        completes, so the three stages overlap across symbols.
+        
+        Safe to call while an event loop is running (the work then runs on a
+        worker thread, blocking that loop until it finishes); async callers
+        should await aprocess_multiple_stocks_intraday instead.
+        
         Args:
             symbols: List of stock symbols
             interval: Intraday interval
@@ -100,20 +291,31 @@ class ETLService:
         Returns:
             Dictionary mapping symbols to records processed
         """
+        return run_sync(self.aprocess_multiple_stocks_intraday(symbols, interval))
+    
+    async def aprocess_multiple_stocks_intraday(self, symbols: List[str], interval: str = "5min") -> Dict[str, int]:
+        """Async process_multiple_stocks_intraday, for callers already running an event loop"""
         results = {}
         
-        logger.info(f"Starting batch ETL processing for {len(symbols)} stocks")
+        logger.info("Starting batch ETL processing for %d stocks", len(symbols))
         
-        for symbol in symbols:
-            try:
-                records_processed = self.process_stock_intraday(symbol, interval)
-                results[symbol] = records_processed
-            except Exception as e:
-                logger.error(f"Failed to process {symbol}: {e}")
-                results[symbol] = 0
+        # Ensure database connection is available
+        await asyncio.to_thread(self._ensure_db_connection)
+        await asyncio.to_thread(self.ensure_partitions)
+        
+        try:
+            processed = await self._process_multiple_stocks_async(symbols, interval)
+        finally:
+            await asyncio.to_thread(self.flush_job_logs)
+        
+        for symbol, records_processed in zip(symbols, processed):
+            if isinstance(records_processed, BaseException):
+                logger.error(f"Failed to process {symbol}: {records_processed}")
+                records_processed = 0
+            results[symbol] = records_processed
         
         total_processed = sum(results.values())
-        logger.info(f"Batch ETL processing completed. Total records processed: {total_processed}")
+        logger.info("Batch ETL processing completed. Total records processed: %d", total_processed)
         
         return results
     
@@ -128,39 +330,47 @@ class ETLService:
         Returns:
             Comprehensive ETL pipeline results
         """
-        pipeline_start = datetime.utcnow()
+        # Wall-clock reads only at the boundaries; the duration uses perf_counter
+        pipeline_start = datetime.now(timezone.utc)
+        t0 = time.perf_counter()
         
-        logger.info(f"Starting ETL pipeline for {len(symbols)} stocks with {interval} interval")
+        logger.info("Starting ETL pipeline for %d stocks with %s interval", len(symbols), interval)
         
         # Ensure database connection is available
         self._ensure_db_connection()
+        self.ensure_partitions()
         
-        # Step 1: Extract all data
-        logger.info("=== EXTRACTION PHASE ===")
-        raw_data_dict = self.extractor.extract_multiple_stocks(symbols, interval)
-        
-        # Step 2: Transform all data
-        logger.info("=== TRANSFORMATION PHASE ===")
-        transformed_data_dict = self.transformer.transform_multiple_stocks(raw_data_dict)
+        # Symbols stream through extract -> transform -> load, so only a few
+        # symbols' bars are in memory at once and loading starts right away
+        logger.info("=== EXTRACT / TRANSFORM / LOAD ===")
+        counters = PipelineCounters(total_symbols=len(symbols))
+        try:
+            run_sync(self._run_pipeline_async(symbols, interval, counters))
+        finally:
+            self.flush_job_logs()
         
-        # Step 3: Load all data
-        logger.info("=== LOADING PHASE ===")
-        loading_results = self.loader.load_multiple_stocks(transformed_data_dict)
+        # Fold the new bars into the analytics rollup; loads already succeeded, so only warn.
+        # A run that loaded nothing leaves the view as current as it was.
+        if counters.loaded_records:
+            try:
+                self.db_manager.refresh_price_rollup()
+            except Exception as e:
+                logger.warning("Price rollup refresh failed, analytics may lag until the next run: %s", e)
         
         # Calculate pipeline statistics
-        pipeline_end = datetime.utcnow()
-        pipeline_duration = pipeline_end - pipeline_start
+        duration_seconds = time.perf_counter() - t0
+        pipeline_end = datetime.now(timezone.utc)
         
-        # Get detailed stats from each phase
-        extraction_stats = self._get_extraction_stats(raw_data_dict)
-        transformation_stats = self.transformer.get_transformation_stats(transformed_data_dict)
-        loading_stats = self.loader.get_loading_stats(loading_results)
+        # Per-phase stats were accumulated while the symbols flowed through
+        extraction_stats = counters.extraction_stats()
+        transformation_stats = counters.transformation_stats()
+        loading_stats = counters.loading_stats()
         
         pipeline_results = {
             'pipeline_metadata': {
                 'start_time': pipeline_start.isoformat(),
                 'end_time': pipeline_end.isoformat(),
-                'duration_seconds': pipeline_duration.total_seconds(),
+                'duration_seconds': duration_seconds,
                 'symbols_processed': len(symbols),
                 'interval': interval
             },
@@ -171,58 +381,89 @@ class ETLService:
             'total_records_processed': loading_stats['total_loaded_records']
         }
         
-        logger.info(f"ETL pipeline completed in {pipeline_duration.total_seconds():.2f} seconds")
-        logger.info(f"Overall success rate: {pipeline_results['overall_success_rate']:.1f}%")
-        logger.info(f"Total records processed: {pipeline_results['total_records_processed']}")
+        logger.info("ETL pipeline completed in %.2f seconds", duration_seconds)
+        logger.info("Overall success rate: %.1f%%", pipeline_results['overall_success_rate'])
+        logger.info("Total records processed: %d", pipeline_results['total_records_processed'])
         
         return pipeline_results
     
-    def _get_extraction_stats(self, raw_data_dict: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, Any]:
-        """Get statistics about the extraction phase"""
-        total_symbols = len(raw_data_dict)
-        successful_extractions = sum(1 for data in raw_data_dict.values() if data is not None)
-        failed_extractions = total_symbols - successful_extractions
+    async def _run_pipeline_async(self, symbols: List[str], interval: str, counters: PipelineCounters):
+        """Producer/consumer ETL: extract workers feed transform workers, which feed one loader"""
+        concurrency = self.extractor.max_concurrent_requests
+        raw_q: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        xform_q: asyncio.Queue = asyncio.Queue(maxsize=TRANSFORM_WORKERS)
+        pending = iter(symbols)  # shared by the extract workers
+        loop = asyncio.get_running_loop()
+        cpu_pool = self._get_cpu_pool()
         
-        total_data_points = 0
-        for data in raw_data_dict.values():
-            if data and 'time_series' in data:
-                total_data_points += len(data['time_series'])
+        async def extract_worker(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore):
+            for symbol in pending:
+                try:
+                    raw_data = await self.extractor.extract_intraday_data_async(session, symbol, interval, semaphore)
+                except Exception as e:
+                    logger.error(f"Unexpected error extracting data for {symbol}: {e}")
+                    raw_data = None
+                if raw_data is not None:
+                    counters.extracted += 1
+                    counters.data_points += len(raw_data.get('time_series', ()))
+                await raw_q.put((symbol, raw_data))
         
-        return {
-            'total_symbols': total_symbols,
-            'successful_extractions': successful_extractions,
-            'failed_extractions': failed_extractions,
-            'total_data_points': total_data_points,
-            'success_rate': (successful_extractions / total_symbols * 100) if total_symbols > 0 else 0
-        }
+        async def transform_worker():
+            while (item := await raw_q.get()) is not None:
+                symbol, raw_data = item
+                transformed_data = None
+                if raw_data is None:
+                    logger.warning("Skipping transformation for %s - no raw data", symbol)
+                else:
+                    try:
+                        if cpu_pool is not None:
+                            transformed_data = await loop.run_in_executor(cpu_pool, _transform_in_worker, raw_data)
+                        else:
+                            transformed_data = await asyncio.to_thread(self.transformer.transform_intraday_data, raw_data)
+                    except Exception as e:
+                        logger.error(f"Error transforming data for {symbol}: {e}")
+                if transformed_data is not None:
+                    counters.transformed += 1
+                    counters.transformed_records += transformed_data.record_count
+                await xform_q.put((symbol, transformed_data))
+        
+        async def load_worker():
+            while (item := await xform_q.get()) is not None:
+                symbol, transformed_data = item
+                if transformed_data is None:
+                    logger.warning("Skipping loading for %s - no transformed data", symbol)
+                    continue
+                try:
+                    result = await asyncio.to_thread(self.loader.load_transformed_data, transformed_data)
+                except Exception as e:
+                    logger.error(f"Failed to load data for {symbol}: {e}")
+                    continue
+                if result.get('success', False):
+                    counters.loaded += 1
+                    counters.loaded_price_records += result.get('total_price_records', 0)
+                    counters.loaded_records += result.get('prices_loaded', 0)
+        
+        transformers = [asyncio.create_task(transform_worker()) for _ in range(TRANSFORM_WORKERS)]
+        loader = asyncio.create_task(load_worker())
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        async with self.extractor.client_session() as session:
+            await asyncio.gather(*[extract_worker(session, semaphore) for _ in range(min(concurrency, len(symbols)))])
+        
+        for _ in transformers:
+            await raw_q.put(None)
+        await asyncio.gather(*transformers)
+        await xform_q.put(None)
+        await loader
     
     def _log_etl_job(self, symbol: str, total_records: int, processed_records: int, 
                      status: str, error_message: str = None):
-        """Log ETL job execution"""
-        try:
-            log_sql = """
-                INSERT INTO etl_job_logs 
-                (job_name, status, start_time, end_time, records_processed, 
-                 total_records, error_message, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            
-            now = datetime.utcnow()
-            params = (
-                f"intraday_etl_{symbol}",
-                status,
-                now,
-                now,
-                processed_records,
-                total_records,
-                error_message,
-                now
-            )
-            
-            self.db_manager.execute_query(log_sql, params)
-            
-        except Exception as e:
-            logger.error(f"Failed to log ETL job: {e}")
+        """Buffer an ETL job log row in the loader's buffer; written by flush_job_logs()"""
+        self.loader._log_etl_job(symbol, total_records, processed_records, status, error_message)
+    
+    def flush_job_logs(self):
+        """Write all buffered ETL job log rows in one multi-row INSERT"""
+        self.loader.flush_job_logs()
     
     def get_etl_status(self) -> Dict[str, Any]:
         """Get current ETL system status"""
@@ -231,18 +472,7 @@ class ETLService:
             self._ensure_db_connection()
             
             # Get recent job statistics
-            status_sql = """
-                SELECT 
-                    COUNT(*) as total_jobs,
-                    COUNT(CASE WHEN status = 'SUCCESS' THEN 1 END) as successful_jobs,
-                    COUNT(CASE WHEN status = 'FAILED' THEN 1 END) as failed_jobs,
-                    COUNT(CASE WHEN status = 'RUNNING' THEN 1 END) as running_jobs,
-                    MAX(start_time) as last_run
-                FROM etl_job_logs 
-                WHERE created_at >= NOW() - INTERVAL '7 days'
-            """
-            
-            result = self.db_manager.execute_query(status_sql, fetch_one=True)
+            result = self.db_manager.execute_prepared(_STATUS_STATEMENT, fetch_one=True)
             
             if result:
                 return {
@@ -275,10 +505,20 @@ class ETLService:
                 'error': str(e)
             }
     
+    def _get_cpu_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Process pool for transforms when TRANSFORM_PROCESSES is set, created on first use"""
+        if self.transform_processes > 0 and self._cpu_pool is None:
+            self._cpu_pool = ProcessPoolExecutor(max_workers=self.transform_processes)
+        return self._cpu_pool
+    
     def cleanup(self):
         """Clean up resources"""
         try:
+            self.flush_job_logs()
             self.extractor.close()
+            if self._cpu_pool is not None:
+                self._cpu_pool.shutdown()
+                self._cpu_pool = None
             logger.info("ETL service cleanup completed")
         except Exception as e:
             logger.error(f"Error during ETL service cleanup: {e}")
@@ -6,7 +6,8 @@ Provides CRUD operations on stored market data
 
 from fastapi import FastAPI, HTTPException, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import uvicorn
@@ -26,7 +27,9 @@ app = FastAPI(
     description="RESTful API for Stock Data Intraday ETL System",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson serializes datetimes and Decimals natively and far faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -38,6 +41,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (paginated price lists are repetitive JSON) for clients sending Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Initialize services
 stock_service = StockService()
 price_service = PriceService()
@@ -61,18 +67,21 @@ async def health_check():
 # Stock endpoints
 @app.get("/api/stocks", response_model=PaginatedResponse[StockResponse], tags=["Stocks"])
 async def get_stocks(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (deprecated, use after_symbol)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     symbol: Optional[str] = Query(None, description="Filter by stock symbol"),
     exchange: Optional[str] = Query(None, description="Filter by exchange"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    after_symbol: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    need_total: bool = Query(False, description="Also return the total number of matching records"),
     db: DatabaseManager = Depends(get_db)
 ):
     """Get stocks with pagination and filtering"""
     try:
         stocks = await stock_service.get_stocks(
             db, skip=skip, limit=limit, 
-            symbol=symbol, exchange=exchange, is_active=is_active
+            symbol=symbol, exchange=exchange, is_active=is_active,
+            after_symbol=after_symbol, need_total=need_total
         )
         return stocks
     except Exception as e:
@@ -143,20 +152,25 @@ async def delete_stock(
 @app.get("/api/stocks/{symbol}/prices", response_model=PaginatedResponse[StockPriceResponse], tags=["Prices"])
 async def get_stock_prices(
     symbol: str,
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (deprecated, use cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     start_date: Optional[datetime] = Query(None, description="Start date for price range"),
     end_date: Optional[datetime] = Query(None, description="End date for price range"),
     interval: Optional[str] = Query(None, description="Filter by time interval"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    need_total: bool = Query(False, description="Also return the total number of matching records"),
     db: DatabaseManager = Depends(get_db)
 ):
     """Get stock prices with pagination and filtering"""
     try:
         prices = await price_service.get_stock_prices(
             db, symbol.upper(), skip=skip, limit=limit,
-            start_date=start_date, end_date=end_date, interval=interval
+            start_date=start_date, end_date=end_date, interval=interval, cursor=cursor, need_total=need_total
         )
-        return prices
+        # Rows go straight to orjson; response_model still documents the shape
+        return ORJSONResponse(prices)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -177,14 +191,28 @@ async def get_latest_price(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/prices/latest", response_model=Dict[str, StockPriceResponse], tags=["Prices"])
+async def get_latest_prices(
+    symbols: List[str] = Query(..., description="Stock symbols"),
+    interval: str = Query("5min", description="Time interval for latest prices"),
+    db: DatabaseManager = Depends(get_db)
+):
+    """Get the latest price for each of several stocks"""
+    try:
+        return await price_service.get_latest_prices(db, [symbol.upper() for symbol in symbols], interval)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/prices", response_model=PaginatedResponse[StockPriceResponse], tags=["Prices"])
 async def get_all_prices(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (deprecated, use cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     start_date: Optional[datetime] = Query(None, description="Start date for price range"),
     end_date: Optional[datetime] = Query(None, description="End date for price range"),
     interval: Optional[str] = Query(None, description="Filter by time interval"),
     symbols: Optional[List[str]] = Query(None, description="Filter by stock symbols"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    need_total: bool = Query(False, description="Also return the total number of matching records"),
     db: DatabaseManager = Depends(get_db)
 ):
     """Get all stock prices with pagination and filtering"""
@@ -192,21 +220,26 @@ async def get_all_prices(
         prices = await price_service.get_all_prices(
             db, skip=skip, limit=limit,
             start_date=start_date, end_date=end_date, 
-            interval=interval, symbols=symbols
+            interval=interval, symbols=symbols, cursor=cursor, need_total=need_total
         )
-        return prices
+        # Rows go straight to orjson; response_model still documents the shape
+        return ORJSONResponse(prices)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # ETL Job endpoints
 @app.get("/api/etl/jobs", response_model=PaginatedResponse[ETLJobResponse], tags=["ETL"])
 async def get_etl_jobs(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (deprecated, use cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     status: Optional[str] = Query(None, description="Filter by job status"),
     job_name: Optional[str] = Query(None, description="Filter by job name"),
     start_date: Optional[datetime] = Query(None, description="Start date for job range"),
     end_date: Optional[datetime] = Query(None, description="End date for job range"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    need_total: bool = Query(False, description="Also return the total number of matching records"),
     db: DatabaseManager = Depends(get_db)
 ):
     """Get ETL job logs with pagination and filtering"""
@@ -214,9 +247,11 @@ async def get_etl_jobs(
         jobs = await etl_service.get_etl_jobs(
             db, skip=skip, limit=limit,
             status=status, job_name=job_name,
-            start_date=start_date, end_date=end_date
+            start_date=start_date, end_date=end_date, cursor=cursor, need_total=need_total
         )
         return jobs
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -267,10 +302,18 @@ if __name__ == "__main__":
     port = int(os.getenv("API_PORT", 8000))
     host = os.getenv("API_HOST", "0.0.0.0")
     
+    # The reloader is for development only; uvicorn ignores workers while it is on
+    reload = os.getenv("API_RELOAD", "false").lower() == "true"
+    
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
-        reload=True,
+        # libuv event loop and C HTTP parser, both shipped with uvicorn[standard]
+        loop="uvloop",
+        http="httptools",
+        reload=reload,
+        workers=None if reload else int(os.getenv("API_WORKERS", 4)),
+        access_log=os.getenv("API_ACCESS_LOG", "false").lower() == "true",
         log_level="info"
     )
@@ -3,7 +3,7 @@
 Pydantic models for API request/response validation
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Generic, TypeVar
 from datetime import datetime
 
@@ -12,11 +12,14 @@ T = TypeVar('T')
 
 class PaginatedResponse(BaseModel, Generic[T]):
     """Generic paginated response model"""
-    items: List[T]
-    total: int
+    items: list[T]
+    # None unless the request asked for need_total (counting is not free)
+    total: Optional[int] = None
     skip: int
     limit: int
     has_more: bool
+    # Pass back as `cursor` to fetch the next page (keyset pagination)
+    next_cursor: Optional[str] = None
 
 class StockResponse(BaseModel):
     """Stock response model"""
@@ -28,11 +31,8 @@ class StockResponse(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    # datetimes serialize to ISO 8601 natively in pydantic-core
+    model_config = ConfigDict(from_attributes=True)
 
 class StockPriceResponse(BaseModel):
     """Stock price response model"""
@@ -48,11 +48,8 @@ class StockPriceResponse(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    # datetimes serialize to ISO 8601 natively in pydantic-core
+    model_config = ConfigDict(from_attributes=True)
 
 class ETLJobResponse(BaseModel):
     """ETL job response model"""
@@ -66,11 +63,8 @@ class ETLJobResponse(BaseModel):
     error_message: Optional[str] = Field(None, description="Error message if failed")
     created_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    # datetimes serialize to ISO 8601 natively in pydantic-core
+    model_config = ConfigDict(from_attributes=True)
 
 class StockCreateRequest(BaseModel):
     """Request model for creating a stock"""
@@ -4,17 +4,197 @@ Service layer for API business logic
 Handles data operations and business rules
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Awaitable, Hashable
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
+import base64
+import hashlib
+import itertools
 import logging
-from alpha_vantage_intraday.DB.database import DatabaseManager
+import re
+import time
+from alpha_vantage_intraday.DB.database import DatabaseManager, POOL_MAX_CONNECTIONS, PRICE_ROLLUP_SELECT
 from models import StockResponse, StockPriceResponse, ETLJobResponse, PaginatedResponse
 
 logger = logging.getLogger(__name__)
 
+# psycopg2 is blocking, so queries run here instead of on the event loop;
+# one worker per pooled connection
+DB_POOL = ThreadPoolExecutor(max_workers=POOL_MAX_CONNECTIONS, thread_name_prefix='api-db')
+
+# Seconds ETLService.get_etl_status serves its last result before re-querying
+STATUS_CACHE_TTL = 5.0
+
+# Seconds single-stock and latest-price lookups are served from memory
+STOCK_CACHE_TTL = 60.0
+LATEST_PRICE_CACHE_TTL = 30.0
+LOOKUP_CACHE_SIZE = 4096
+
+# Query text -> (prepared statement name, $n-placeholder statement), see run_prepared
+_PREPARED: Dict[str, tuple] = {}
+
+async def run_query(db: DatabaseManager, query: str, params: tuple = None, **kwargs):
+    """Run DatabaseManager.execute_query on DB_POOL without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(DB_POOL, partial(db.execute_query, query, params, **kwargs))
+
+async def run_prepared(db: DatabaseManager, query: str, params: tuple = (), **kwargs):
+    """
+    Like run_query, but through a server-side prepared statement
+    
+    `query` uses positional %s placeholders only. It is rewritten to $1, $2, ...
+    and named after a hash of its text, so each distinct query (including each
+    filter combination a listing builds) is parsed and planned once per pooled
+    connection instead of on every call.
+    """
+    prepared = _PREPARED.get(query)
+    if prepared is None:
+        counter = itertools.count(1)
+        statement = re.sub(r'%s', lambda _: f"${next(counter)}", query)
+        if '%' in statement:
+            raise ValueError("run_prepared only supports positional %s placeholders")
+        prepared = (f"api_{hashlib.blake2b(query.encode(), digest_size=8).hexdigest()}", statement)
+        _PREPARED[query] = prepared
+    
+    name, statement = prepared
+    db.register_prepared(name, statement)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(DB_POOL, partial(db.execute_prepared, name, tuple(params or ()), **kwargs))
+
+class TTLCache:
+    """
+    Small LRU cache with per-entry expiry for async lookups
+    
+    Concurrent misses for the same key share one in-flight load, so a burst
+    of requests costs a single query. None results are not cached.
+    """
+    
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+    
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, awaiting load() on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            return entry[1]
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(load())
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._store, key))
+        # shield: one cancelled request must not cancel the load others await
+        return await asyncio.shield(task)
+    
+    def _store(self, key: Hashable, task: asyncio.Task):
+        """Done-callback of an in-flight load: cache its result"""
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None or task.result() is None:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, task.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def pop(self, key: Hashable):
+        """Drop a key, e.g. after a write that changes it"""
+        self._entries.pop(key, None)
+
+def where_sql(conditions: List[str]) -> str:
+    """WHERE clause ANDing conditions, or an empty string when there are none"""
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+async def count_rows(db: DatabaseManager, table: str, conditions: List[str], params: list) -> int:
+    """
+    Exact row count for a paginated listing's `total`
+    
+    A bare COUNT(*) over the listing's filters, with no ORDER BY or column
+    list, so the planner only has to find matching rows.
+    """
+    count_sql = f"SELECT COUNT(*) FROM {table} {where_sql(conditions)}"
+    result = await run_prepared(db, count_sql, tuple(params), fetch_one=True)
+    return result['count'] if result else 0
+
+async def fetch_page(db: DatabaseManager, table: str, conditions: List[str], params: list,
+                     need_total: bool, query_sql: str, page_params: list) -> tuple:
+    """
+    Run a page query, plus the total count when need_total is set
+    
+    The two queries are independent, so they run concurrently on DB_POOL
+    (separate pooled connections) instead of back to back. conditions and
+    params are the listing's filters without the cursor/paging terms.
+    Returns (total or None, rows).
+    """
+    page = run_prepared(db, query_sql, tuple(page_params), fetch=True)
+    if not need_total:
+        return None, await page or []
+    total, rows = await asyncio.gather(count_rows(db, table, conditions, params), page)
+    return total, rows or []
+
+def rollup_parts_cte(by_symbol: bool) -> str:
+    """
+    WITH clause defining `parts`: daily rollup rows covering %(start)s..%(end)s
+    
+    Days wholly inside the range come from the price_daily_rollup view,
+    except those written since its last refresh (price_rollup_state); those
+    and the partial days at either end are rolled up from raw bars with the
+    same PRICE_ROLLUP_SELECT, so aggregates over `parts` are exact for any range.
+    Takes %(interval)s, %(start)s, %(end)s and, with by_symbol, %(symbol)s.
+    """
+    symbol_filter = "AND stock_symbol = %(symbol)s" if by_symbol else ""
+    edge_bars = f"""(
+        SELECT p.stock_symbol, p.interval, p.timestamp, p.open_price, p.high_price,
+               p.low_price, p.close_price, p.volume
+        FROM stock_prices_intraday p, bounds
+        WHERE p.interval = %(interval)s {symbol_filter}
+          AND p.timestamp >= %(start)s AND p.timestamp <= %(end)s
+          AND NOT (p.timestamp >= bounds.full_from AND p.timestamp < bounds.full_to)
+    )"""
+    return f"""
+        WITH bounds AS (
+            SELECT date_trunc('day', %(start)s::timestamp)
+                       + CASE WHEN %(start)s::timestamp > date_trunc('day', %(start)s::timestamp)
+                              THEN INTERVAL '1 day' ELSE INTERVAL '0' END AS full_from,
+                   LEAST(date_trunc('day', %(end)s::timestamp),
+                         (SELECT stale_from FROM price_rollup_state)) AS full_to
+        ),
+        parts AS (
+            SELECT r.* FROM price_daily_rollup r, bounds
+            WHERE r.interval = %(interval)s {symbol_filter}
+              AND r.day >= bounds.full_from AND r.day < bounds.full_to
+            UNION ALL
+            {PRICE_ROLLUP_SELECT.format(source=edge_bars)}
+        )
+    """
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for the row a page ended on"""
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{row_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor from encode_cursor into (timestamp, id); raises ValueError if malformed"""
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+# Rows below come from typed table columns that already match the response
+# models, so they are built with model_construct() and skip per-field validation
+
 class StockService:
     """Service for stock-related operations"""
     
+    def __init__(self):
+        self._stock_cache = TTLCache(STOCK_CACHE_TTL, LOOKUP_CACHE_SIZE)
+    
     async def get_stocks(
         self, 
         db: DatabaseManager, 
@@ -22,9 +202,16 @@ class StockService:
         limit: int = 100,
         symbol: Optional[str] = None,
         exchange: Optional[str] = None,
-        is_active: Optional[bool] = None
+        is_active: Optional[bool] = None,
+        after_symbol: Optional[str] = None,
+        need_total: bool = False
     ) -> PaginatedResponse[StockResponse]:
-        """Get stocks with pagination and filtering"""
+        """
+        Get stocks with pagination and filtering
+        
+        Pass the previous page's next_cursor (its last symbol) as after_symbol
+        to seek past it in the symbol index; skip is the deprecated fallback.
+        """
         try:
             # Build query conditions
             conditions = []
@@ -42,34 +229,43 @@ class StockService:
                 conditions.append("is_active = %s")
                 params.append(is_active)
             
-            where_clause = " AND ".join(conditions) if conditions else "1=1"
-            
-            # Get total count
-            count_sql = f"SELECT COUNT(*) FROM stocks WHERE {where_clause}"
-            total_result = db.execute_query(count_sql, tuple(params), fetch_one=True)
-            total = total_result['count'] if total_result else 0
+            page_conditions = list(conditions)
+            page_params = list(params)
+            if after_symbol:
+                page_conditions.append("symbol > %s")
+                page_params.append(after_symbol)
+                skip = 0
+            elif skip:
+                logger.warning("Offset pagination (skip) is deprecated; pass next_cursor as after_symbol")
+            page_where = where_sql(page_conditions)
             
             # Get paginated results
             query_sql = f"""
                 SELECT id, symbol, company_name, exchange, is_active, created_at, updated_at
                 FROM stocks 
-                WHERE {where_clause}
+                {page_where}
                 ORDER BY symbol
                 LIMIT %s OFFSET %s
             """
-            params.extend([limit, skip])
+            # One extra row tells whether another page follows
+            page_params.extend([limit + 1, skip])
             
-            results = db.execute_query(query_sql, tuple(params), fetch=True)
+            # The total is only counted when asked for; has_more does not need it
+            total, results = await fetch_page(db, 'stocks', conditions, params, need_total, query_sql, page_params)
+            has_more = len(results) > limit
             
             # Convert to response models
-            stocks = [StockResponse(**dict(row)) for row in results] if results else []
+            stocks = [StockResponse.model_construct(**row) for row in results[:limit]]
+            
+            next_cursor = stocks[-1].symbol if has_more else None
             
             return PaginatedResponse(
                 items=stocks,
                 total=total,
                 skip=skip,
                 limit=limit,
-                has_more=(skip + limit) < total
+                has_more=has_more,
+                next_cursor=next_cursor
             )
             
         except Exception as e:
@@ -77,17 +273,21 @@ class StockService:
             raise
     
     async def get_stock_by_symbol(self, db: DatabaseManager, symbol: str) -> Optional[StockResponse]:
-        """Get a specific stock by symbol"""
+        """Get a specific stock by symbol (cached for STOCK_CACHE_TTL seconds)"""
+        return await self._stock_cache.get_or_load(symbol, partial(self._load_stock, db, symbol))
+    
+    async def _load_stock(self, db: DatabaseManager, symbol: str) -> Optional[StockResponse]:
+        """Query one stock by symbol"""
         try:
             query_sql = """
                 SELECT id, symbol, company_name, exchange, is_active, created_at, updated_at
                 FROM stocks 
                 WHERE symbol = %s
             """
-            result = db.execute_query(query_sql, (symbol,), fetch_one=True)
+            result = await run_prepared(db, query_sql, (symbol,), fetch_one=True)
             
             if result:
-                return StockResponse(**dict(result))
+                return StockResponse.model_construct(**result)
             return None
             
         except Exception as e:
@@ -97,14 +297,11 @@ class StockService:
     async def create_stock(self, db: DatabaseManager, stock_data: StockResponse) -> StockResponse:
         """Create a new stock"""
         try:
-            # Check if stock already exists
-            existing = await self.get_stock_by_symbol(db, stock_data.symbol)
-            if existing:
-                raise ValueError(f"Stock {stock_data.symbol} already exists")
-            
+            # An existing symbol makes the insert a no-op that returns no row
             insert_sql = """
                 INSERT INTO stocks (symbol, company_name, exchange, is_active)
                 VALUES (%s, %s, %s, %s)
+                ON CONFLICT (symbol) DO NOTHING
                 RETURNING id, symbol, company_name, exchange, is_active, created_at, updated_at
             """
             
@@ -115,26 +312,26 @@ class StockService:
                 stock_data.is_active
             )
             
-            result = db.execute_query(insert_sql, params, fetch_one=True)
+            result = await run_prepared(db, insert_sql, params, fetch_one=True)
             
             if result:
-                return StockResponse(**dict(result))
+                self._stock_cache.pop(stock_data.symbol)
+                return StockResponse.model_construct(**result)
             else:
-                raise ValueError("Failed to create stock")
+                raise ValueError(f"Stock {stock_data.symbol} already exists")
                 
         except Exception as e:
             logger.error(f"Error creating stock: {e}")
             raise
     
     async def update_stock(self, db: DatabaseManager, symbol: str, stock_data: StockResponse) -> Optional[StockResponse]:
-        """Update an existing stock"""
+        """Update an existing stock; returns None if it does not exist"""
+        # Nothing to change: answer from the (cached) lookup without building an UPDATE
+        if stock_data.company_name is None and stock_data.exchange is None and stock_data.is_active is None:
+            return await self.get_stock_by_symbol(db, symbol)
+        
         try:
-            # Check if stock exists
-            existing = await self.get_stock_by_symbol(db, symbol)
-            if not existing:
-                return None
-            
-            # Build update query
+            # Build update query; a missing symbol simply updates (and returns) no row
             update_fields = []
             params = []
             
@@ -150,9 +347,6 @@ class StockService:
                 update_fields.append("is_active = %s")
                 params.append(stock_data.is_active)
             
-            if not update_fields:
-                return existing  # No changes
-            
             update_fields.append("updated_at = CURRENT_TIMESTAMP")
             
             update_sql = f"""
@@ -163,28 +357,30 @@ class StockService:
             """
             params.append(symbol)
             
-            result = db.execute_query(update_sql, tuple(params), fetch_one=True)
+            result = await run_prepared(db, update_sql, tuple(params), fetch_one=True)
+            self._stock_cache.pop(symbol)
             
             if result:
-                return StockResponse(**dict(result))
-            else:
-                raise ValueError("Failed to update stock")
+                return StockResponse.model_construct(**result)
+            return None
                 
         except Exception as e:
             logger.error(f"Error updating stock {symbol}: {e}")
             raise
     
     async def delete_stock(self, db: DatabaseManager, symbol: str) -> bool:
-        """Soft delete a stock (sets is_active to False)"""
+        """Soft delete a stock (sets is_active to False); returns False if it does not exist"""
         try:
             update_sql = """
                 UPDATE stocks 
                 SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP
                 WHERE symbol = %s
+                RETURNING id
             """
             
-            result = db.execute_query(update_sql, (symbol,))
-            return True
+            result = await run_prepared(db, update_sql, (symbol,), fetch_one=True)
+            self._stock_cache.pop(symbol)
+            return result is not None
             
         except Exception as e:
             logger.error(f"Error deleting stock {symbol}: {e}")
@@ -193,6 +389,93 @@ class StockService:
 class PriceService:
     """Service for stock price-related operations"""
     
+    def __init__(self):
+        self._latest_cache = TTLCache(LATEST_PRICE_CACHE_TTL, LOOKUP_CACHE_SIZE)
+    
+    async def _fetch_price_page(
+        self,
+        db: DatabaseManager,
+        conditions: List[str],
+        params: list,
+        skip: int,
+        limit: int,
+        cursor: Optional[str],
+        need_total: bool,
+        symbols: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page of prices, newest first
+        
+        With a cursor the page starts after the (timestamp, id) it encodes, so
+        the database seeks in the index instead of reading and discarding
+        `skip` rows. `skip` is still honoured when no cursor is given.
+        
+        With symbols, each symbol's newest rows are read by a LATERAL index seek
+        and merged, so the query touches at most skip + limit + 1 rows per
+        symbol instead of sorting every matching row.
+        
+        The page is returned as plain rows in the PaginatedResponse[StockPriceResponse]
+        shape, ready for orjson; building a model per row dominated large reads.
+        """
+        page_conditions = list(conditions)
+        page_params = list(params)
+        if cursor:
+            page_conditions.append("(timestamp, id) < (%s, %s)")
+            page_params.extend(decode_cursor(cursor))
+            skip = 0
+        elif skip:
+            logger.warning("Offset pagination (skip) is deprecated; pass the next_cursor from the previous page")
+        # One extra row tells whether another page follows
+        if symbols:
+            page_where = where_sql(["stock_symbol = s.symbol"] + page_conditions)
+            query_sql = f"""
+                SELECT p.id, p.stock_symbol, p.timestamp, p.open_price::float8 AS open_price,
+                       p.high_price::float8 AS high_price, p.low_price::float8 AS low_price,
+                       p.close_price::float8 AS close_price, p.volume, p.interval, p.created_at, p.updated_at
+                FROM unnest(%s::text[]) AS s(symbol)
+                CROSS JOIN LATERAL (
+                    SELECT * FROM stock_prices_intraday
+                    {page_where}
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT %s
+                ) p
+                ORDER BY p.timestamp DESC, p.id DESC
+                LIMIT %s OFFSET %s
+            """
+            page_params = [list(symbols)] + page_params + [skip + limit + 1, limit + 1, skip]
+            
+            # The total still counts the symbols as one filter
+            conditions = conditions + ["stock_symbol = ANY(%s::text[])"]
+            params = params + [list(symbols)]
+        else:
+            query_sql = f"""
+                SELECT id, stock_symbol, timestamp, open_price::float8 AS open_price,
+                       high_price::float8 AS high_price, low_price::float8 AS low_price,
+                       close_price::float8 AS close_price, volume, interval, created_at, updated_at
+                FROM stock_prices_intraday 
+                {where_sql(page_conditions)}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT %s OFFSET %s
+            """
+            page_params.extend([limit + 1, skip])
+        
+        # The total is only counted when asked for; has_more does not need it
+        total, prices = await fetch_page(db, 'stock_prices_intraday', conditions, params, need_total,
+                                         query_sql, page_params)
+        has_more = len(prices) > limit
+        del prices[limit:]
+        
+        next_cursor = encode_cursor(prices[-1]['timestamp'], prices[-1]['id']) if has_more else None
+        
+        return {
+            'items': prices,
+            'total': total,
+            'skip': skip,
+            'limit': limit,
+            'has_more': has_more,
+            'next_cursor': next_cursor
+        }
+    
     async def get_stock_prices(
         self, 
         db: DatabaseManager, 
@@ -201,8 +484,10 @@ class PriceService:
         limit: int = 100,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-        interval: Optional[str] = None
-    ) -> PaginatedResponse[StockPriceResponse]:
+        interval: Optional[str] = None,
+        cursor: Optional[str] = None,
+        need_total: bool = False
+    ) -> Dict[str, Any]:
         """Get stock prices with pagination and filtering"""
         try:
             # Build query conditions
@@ -221,63 +506,71 @@ class PriceService:
                 conditions.append("interval = %s")
                 params.append(interval)
             
-            where_clause = " AND ".join(conditions)
-            
-            # Get total count
-            count_sql = f"SELECT COUNT(*) FROM stock_prices_intraday WHERE {where_clause}"
-            total_result = db.execute_query(count_sql, tuple(params), fetch_one=True)
-            total = total_result['count'] if total_result else 0
-            
-            # Get paginated results
-            query_sql = f"""
-                SELECT id, stock_symbol, timestamp, open_price, high_price, low_price, 
-                       close_price, volume, interval, created_at, updated_at
-                FROM stock_prices_intraday 
-                WHERE {where_clause}
-                ORDER BY timestamp DESC
-                LIMIT %s OFFSET %s
-            """
-            params.extend([limit, skip])
-            
-            results = db.execute_query(query_sql, tuple(params), fetch=True)
-            
-            # Convert to response models
-            prices = [StockPriceResponse(**dict(row)) for row in results] if results else []
-            
-            return PaginatedResponse(
-                items=prices,
-                total=total,
-                skip=skip,
-                limit=limit,
-                has_more=(skip + limit) < total
-            )
+            return await self._fetch_price_page(db, conditions, params, skip, limit, cursor, need_total)
             
         except Exception as e:
             logger.error(f"Error getting stock prices for {symbol}: {e}")
             raise
     
     async def get_latest_price(self, db: DatabaseManager, symbol: str, interval: str = "5min") -> Optional[StockPriceResponse]:
-        """Get the latest price for a stock"""
+        """Get the latest price for a stock (cached for LATEST_PRICE_CACHE_TTL seconds)"""
+        return await self._latest_cache.get_or_load(
+            (symbol, interval), partial(self._load_latest_price, db, symbol, interval)
+        )
+    
+    async def _load_latest_price(self, db: DatabaseManager, symbol: str, interval: str) -> Optional[StockPriceResponse]:
+        """Query the newest bar for a symbol/interval"""
         try:
             query_sql = """
-                SELECT id, stock_symbol, timestamp, open_price, high_price, low_price, 
-                       close_price, volume, interval, created_at, updated_at
+                SELECT id, stock_symbol, timestamp, open_price::float8 AS open_price,
+                       high_price::float8 AS high_price, low_price::float8 AS low_price,
+                       close_price::float8 AS close_price, volume, interval, created_at, updated_at
                 FROM stock_prices_intraday 
                 WHERE stock_symbol = %s AND interval = %s
                 ORDER BY timestamp DESC
                 LIMIT 1
             """
             
-            result = db.execute_query(query_sql, (symbol, interval), fetch_one=True)
+            result = await run_prepared(db, query_sql, (symbol, interval), fetch_one=True)
             
             if result:
-                return StockPriceResponse(**dict(result))
+                return StockPriceResponse.model_construct(**result)
             return None
             
         except Exception as e:
             logger.error(f"Error getting latest price for {symbol}: {e}")
             raise
     
+    async def get_latest_prices(self, db: DatabaseManager, symbols: List[str], interval: str = "5min") -> Dict[str, StockPriceResponse]:
+        """
+        Get the latest price for many stocks in one query
+        
+        Each symbol is a LIMIT 1 index seek inside a LATERAL join, so the cost
+        is one round trip regardless of how many symbols are asked for.
+        Symbols without data are left out of the result.
+        """
+        try:
+            query_sql = """
+                SELECT p.id, p.stock_symbol, p.timestamp, p.open_price::float8 AS open_price,
+                       p.high_price::float8 AS high_price, p.low_price::float8 AS low_price,
+                       p.close_price::float8 AS close_price, p.volume, p.interval, p.created_at, p.updated_at
+                FROM unnest(%s::text[]) AS s(symbol)
+                CROSS JOIN LATERAL (
+                    SELECT * FROM stock_prices_intraday
+                    WHERE stock_symbol = s.symbol AND interval = %s
+                    ORDER BY timestamp DESC
+                    LIMIT 1
+                ) p
+            """
+            
+            results = await run_prepared(db, query_sql, (list(symbols), interval), fetch=True)
+            
+            return {row['stock_symbol']: StockPriceResponse.model_construct(**row) for row in results or []}
+            
+        except Exception as e:
+            logger.error(f"Error getting latest prices for {len(symbols)} symbols: {e}")
+            raise
+    
     async def get_all_prices(
         self, 
         db: DatabaseManager, 
@@ -286,8 +579,10 @@ class PriceService:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         interval: Optional[str] = None,
-        symbols: Optional[List[str]] = None
-    ) -> PaginatedResponse[StockPriceResponse]:
+        symbols: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        need_total: bool = False
+    ) -> Dict[str, Any]:
         """Get all stock prices with pagination and filtering"""
         try:
             # Build query conditions
@@ -306,41 +601,10 @@ class PriceService:
                 conditions.append("interval = %s")
                 params.append(interval)
             
-            if symbols:
-                placeholders = ','.join(['%s'] * len(symbols))
-                conditions.append(f"stock_symbol IN ({placeholders})")
-                params.extend(symbols)
-            
-            where_clause = " AND ".join(conditions) if conditions else "1=1"
+            # Duplicates would repeat a symbol's rows in the LATERAL merge
+            symbols = list(dict.fromkeys(symbols)) if symbols else None
             
-            # Get total count
-            count_sql = f"SELECT COUNT(*) FROM stock_prices_intraday WHERE {where_clause}"
-            total_result = db.execute_query(count_sql, tuple(params), fetch_one=True)
-            total = total_result['count'] if total_result else 0
-            
-            # Get paginated results
-            query_sql = f"""
-                SELECT id, stock_symbol, timestamp, open_price, high_price, low_price, 
-                       close_price, volume, interval, created_at, updated_at
-                FROM stock_prices_intraday 
-                WHERE {where_clause}
-                ORDER BY timestamp DESC
-                LIMIT %s OFFSET %s
-            """
-            params.extend([limit, skip])
-            
-            results = db.execute_query(query_sql, tuple(params), fetch=True)
-            
-            # Convert to response models
-            prices = [StockPriceResponse(**dict(row)) for row in results] if results else []
-            
-            return PaginatedResponse(
-                items=prices,
-                total=total,
-                skip=skip,
-                limit=limit,
-                has_more=(skip + limit) < total
-            )
+            return await self._fetch_price_page(db, conditions, params, skip, limit, cursor, need_total, symbols)
             
         except Exception as e:
             logger.error(f"Error getting all prices: {e}")
@@ -362,20 +626,45 @@ class PriceService:
             if not start_date:
                 start_date = end_date - timedelta(days=30)
             
-            # Get price data for the period
-            conditions = ["stock_symbol = %s", "interval = %s", "timestamp >= %s", "timestamp <= %s"]
-            params = [symbol, interval, start_date, end_date]
-            
-            query_sql = f"""
-                SELECT open_price, high_price, low_price, close_price, volume, timestamp
-                FROM stock_prices_intraday 
-                WHERE {' AND '.join(conditions)}
-                ORDER BY timestamp
+            # Aggregate daily rollups instead of every bar; close-to-close moves
+            # between consecutive days are rebuilt from each day's first/last close
+            summary_sql = rollup_parts_cte(by_symbol=True) + """
+                , chained AS (
+                    SELECT parts.*,
+                           (first_close - LAG(last_close) OVER (ORDER BY day))::float8
+                               / NULLIF(LAG(last_close) OVER (ORDER BY day), 0)::float8 * 100 AS boundary_change
+                    FROM parts
+                ), totals AS (
+                SELECT SUM(bar_count)::BIGINT AS total_records,
+                       MIN(min_price)::float8 AS min_price,
+                       MAX(max_price)::float8 AS max_price,
+                       (SUM(sum_price) / (4 * SUM(bar_count)))::float8 AS avg_price,
+                       (ARRAY_AGG(last_close ORDER BY day DESC))[1]::float8 AS latest_close,
+                       MIN(min_volume) AS min_volume,
+                       MAX(max_volume) AS max_volume,
+                       (SUM(sum_volume) / SUM(bar_count))::float8 AS avg_volume,
+                       SUM(sum_volume)::BIGINT AS total_volume,
+                       (SUM(change_count) + COUNT(boundary_change))::BIGINT AS change_count,
+                       COALESCE(SUM(change_sum), 0) + COALESCE(SUM(boundary_change), 0) AS change_sum,
+                       COALESCE(SUM(change_sumsq), 0) + COALESCE(SUM(boundary_change * boundary_change), 0) AS change_sumsq,
+                       LEAST(MIN(change_min), MIN(boundary_change)) AS change_min,
+                       GREATEST(MAX(change_max), MAX(boundary_change)) AS change_max
+                FROM chained
+                )
+                -- Volatility: population standard deviation of bar-to-bar percent changes
+                SELECT totals.*,
+                       COALESCE(change_sum / NULLIF(change_count, 0), 0) AS avg_change,
+                       COALESCE(SQRT(GREATEST(0, change_sumsq / NULLIF(change_count, 0)
+                                              - (change_sum / NULLIF(change_count, 0)) ^ 2)), 0) AS volatility,
+                       COALESCE(change_max, 0) AS max_gain,
+                       COALESCE(change_min, 0) AS max_loss
+                FROM totals
             """
+            params = {'symbol': symbol, 'interval': interval, 'start': start_date, 'end': end_date}
             
-            results = db.execute_query(query_sql, tuple(params), fetch=True)
+            stats = await run_query(db, summary_sql, params, fetch_one=True)
             
-            if not results:
+            if not stats or not stats['total_records']:
                 return {
                     "symbol": symbol,
                     "interval": interval,
@@ -387,55 +676,25 @@ class PriceService:
                     "volatility_stats": {}
                 }
             
-            # Calculate statistics
-            prices = [dict(row) for row in results]
-            
-            # Price statistics
-            all_prices = []
-            for price in prices:
-                all_prices.extend([
-                    price['open_price'], 
-                    price['high_price'], 
-                    price['low_price'], 
-                    price['close_price']
-                ])
-            
             price_stats = {
-                "min": min(all_prices),
-                "max": max(all_prices),
-                "avg": sum(all_prices) / len(all_prices),
-                "latest": prices[-1]['close_price'] if prices else None
+                "min": stats['min_price'],
+                "max": stats['max_price'],
+                "avg": stats['avg_price'],
+                "latest": stats['latest_close']
             }
             
-            # Volume statistics
-            volumes = [price['volume'] for price in prices]
             volume_stats = {
-                "min": min(volumes),
-                "max": max(volumes),
-                "avg": sum(volumes) / len(volumes),
-                "total": sum(volumes)
+                "min": stats['min_volume'],
+                "max": stats['max_volume'],
+                "avg": stats['avg_volume'],
+                "total": stats['total_volume']
             }
             
-            # Volatility statistics (price changes)
-            price_changes = []
-            for i in range(1, len(prices)):
-                change = ((prices[i]['close_price'] - prices[i-1]['close_price']) / prices[i-1]['close_price']) * 100
-                price_changes.append(change)
-            
-            # Calculate volatility (standard deviation of price changes)
-            if price_changes:
-                avg_change = sum(price_changes) / len(price_changes)
-                variance = sum([(float(c - avg_change)) ** 2 for c in price_changes]) / len(price_changes)
-                volatility = float(variance) ** 0.5
-            else:
-                avg_change = 0
-                volatility = 0
-            
             volatility_stats = {
-                "avg_change": avg_change,
-                "max_gain": max(price_changes) if price_changes else 0,
-                "max_loss": min(price_changes) if price_changes else 0,
-                "volatility": volatility
+                "avg_change": stats['avg_change'],
+                "max_gain": stats['max_gain'],
+                "max_loss": stats['max_loss'],
+                "volatility": stats['volatility']
             }
             
             return {
@@ -443,7 +702,7 @@ class PriceService:
                 "interval": interval,
                 "start_date": start_date,
                 "end_date": end_date,
-                "total_records": len(prices),
+                "total_records": stats['total_records'],
                 "price_stats": price_stats,
                 "volume_stats": volume_stats,
                 "volatility_stats": volatility_stats
@@ -468,54 +727,46 @@ class PriceService:
             if not start_date:
                 start_date = end_date - timedelta(days=7)
             
-            # Get market statistics
-            conditions = ["interval = %s", "timestamp >= %s", "timestamp <= %s"]
-            params = [interval, start_date, end_date]
-            
-            # Count total stocks and price records
-            stocks_count_sql = "SELECT COUNT(*) FROM stocks WHERE is_active = TRUE"
-            stocks_result = db.execute_query(stocks_count_sql, fetch_one=True)
-            total_stocks = stocks_result['count'] if stocks_result else 0
-            
-            prices_count_sql = f"SELECT COUNT(*) FROM stock_prices_intraday WHERE {' AND '.join(conditions)}"
-            prices_result = db.execute_query(prices_count_sql, tuple(params), fetch_one=True)
-            total_price_records = prices_result['count'] if prices_result else 0
-            
-            # Get top gainers and losers
-            gainers_sql = f"""
-                SELECT stock_symbol, 
-                       (MAX(close_price) - MIN(open_price)) / MIN(open_price) * 100 as gain_percent
-                FROM stock_prices_intraday 
-                WHERE {' AND '.join(conditions)}
-                GROUP BY stock_symbol
-                HAVING COUNT(*) > 1
-                ORDER BY gain_percent DESC
-                LIMIT 5
-            """
-            top_gainers = db.execute_query(gainers_sql, tuple(params), fetch=True)
-            
-            losers_sql = f"""
-                SELECT stock_symbol, 
-                       (MIN(close_price) - MAX(open_price)) / MAX(open_price) * 100 as loss_percent
-                FROM stock_prices_intraday 
-                WHERE {' AND '.join(conditions)}
-                GROUP BY stock_symbol
-                HAVING COUNT(*) > 1
-                ORDER BY loss_percent ASC
-                LIMIT 5
-            """
-            top_losers = db.execute_query(losers_sql, tuple(params), fetch=True)
-            
-            # Get most active stocks by volume
-            most_active_sql = f"""
-                SELECT stock_symbol, SUM(volume) as total_volume
-                FROM stock_prices_intraday 
-                WHERE {' AND '.join(conditions)}
-                GROUP BY stock_symbol
-                ORDER BY total_volume DESC
-                LIMIT 5
+            # Per-symbol figures come from daily rollups rather than every bar
+            parts_cte = rollup_parts_cte(by_symbol=False)
+            params = {'interval': interval, 'start': start_date, 'end': end_date}
+            
+            # One grouped pass over the rollup parts feeds every figure; the
+            # top-5 lists are built server-side as JSON arrays
+            overview_sql = parts_cte + """,
+                agg AS (
+                    SELECT stock_symbol,
+                           SUM(bar_count) AS bar_count,
+                           MIN(min_open) AS min_open, MAX(max_open) AS max_open,
+                           MIN(min_close) AS min_close, MAX(max_close) AS max_close,
+                           SUM(sum_volume)::BIGINT AS total_volume
+                    FROM parts
+                    GROUP BY stock_symbol
+                )
+                SELECT
+                    (SELECT COUNT(*) FROM stocks WHERE is_active = TRUE) AS total_stocks,
+                    (SELECT COALESCE(SUM(bar_count), 0)::BIGINT FROM agg) AS total_price_records,
+                    (SELECT COALESCE(json_agg(g ORDER BY g.gain_percent DESC), '[]') FROM (
+                        SELECT stock_symbol,
+                               ((max_close - min_open) / min_open * 100)::float8 AS gain_percent
+                        FROM agg WHERE bar_count > 1
+                        ORDER BY gain_percent DESC LIMIT 5
+                    ) g) AS top_gainers,
+                    (SELECT COALESCE(json_agg(l ORDER BY l.loss_percent ASC), '[]') FROM (
+                        SELECT stock_symbol,
+                               ((min_close - max_open) / max_open * 100)::float8 AS loss_percent
+                        FROM agg WHERE bar_count > 1
+                        ORDER BY loss_percent ASC LIMIT 5
+                    ) l) AS top_losers,
+                    (SELECT COALESCE(json_agg(a ORDER BY a.total_volume DESC), '[]') FROM (
+                        SELECT stock_symbol, total_volume
+                        FROM agg
+                        ORDER BY total_volume DESC LIMIT 5
+                    ) a) AS most_active
             """
-            most_active = db.execute_query(most_active_sql, tuple(params), fetch=True)
+            overview = await run_query(db, overview_sql, params, fetch_one=True)
+            total_stocks = overview['total_stocks']
+            total_price_records = overview['total_price_records']
             
             return {
                 "total_stocks": total_stocks,
@@ -528,9 +779,9 @@ class PriceService:
                 "market_stats": {
                     "avg_records_per_stock": total_price_records / total_stocks if total_stocks > 0 else 0
                 },
-                "top_gainers": [dict(row) for row in top_gainers] if top_gainers else [],
-                "top_losers": [dict(row) for row in top_losers] if top_losers else [],
-                "most_active": [dict(row) for row in most_active] if most_active else []
+                "top_gainers": overview['top_gainers'],
+                "top_losers": overview['top_losers'],
+                "most_active": overview['most_active']
             }
             
         except Exception as e:
@@ -540,6 +791,10 @@ class PriceService:
 class ETLService:
     """Service for ETL job-related operations"""
     
+    def __init__(self):
+        # (monotonic time, status) of the last successful get_etl_status query
+        self._status_cache: tuple = (0.0, None)
+    
     async def get_etl_jobs(
         self, 
         db: DatabaseManager, 
@@ -548,9 +803,16 @@ class ETLService:
         status: Optional[str] = None,
         job_name: Optional[str] = None,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        need_total: bool = False
     ) -> PaginatedResponse[ETLJobResponse]:
-        """Get ETL job logs with pagination and filtering"""
+        """
+        Get ETL job logs with pagination and filtering
+        
+        With a cursor (the previous page's next_cursor) the page seeks past
+        that job's (start_time, id); skip is the deprecated fallback.
+        """
         try:
             # Build query conditions
             conditions = []
@@ -572,35 +834,44 @@ class ETLService:
                 conditions.append("start_time <= %s")
                 params.append(end_date)
             
-            where_clause = " AND ".join(conditions) if conditions else "1=1"
-            
-            # Get total count
-            count_sql = f"SELECT COUNT(*) FROM etl_job_logs WHERE {where_clause}"
-            total_result = db.execute_query(count_sql, tuple(params), fetch_one=True)
-            total = total_result['count'] if total_result else 0
+            page_conditions = list(conditions)
+            page_params = list(params)
+            if cursor:
+                page_conditions.append("(start_time, id) < (%s, %s)")
+                page_params.extend(decode_cursor(cursor))
+                skip = 0
+            elif skip:
+                logger.warning("Offset pagination (skip) is deprecated; pass the next_cursor from the previous page")
+            page_where = where_sql(page_conditions)
             
             # Get paginated results
             query_sql = f"""
                 SELECT id, job_name, status, start_time, end_time, records_processed, 
                        total_records, error_message, created_at
                 FROM etl_job_logs 
-                WHERE {where_clause}
-                ORDER BY start_time DESC
+                {page_where}
+                ORDER BY start_time DESC, id DESC
                 LIMIT %s OFFSET %s
             """
-            params.extend([limit, skip])
+            # One extra row tells whether another page follows
+            page_params.extend([limit + 1, skip])
             
-            results = db.execute_query(query_sql, tuple(params), fetch=True)
+            # The total is only counted when asked for; has_more does not need it
+            total, results = await fetch_page(db, 'etl_job_logs', conditions, params, need_total, query_sql, page_params)
+            has_more = len(results) > limit
             
             # Convert to response models
-            jobs = [ETLJobResponse(**dict(row)) for row in results] if results else []
+            jobs = [ETLJobResponse.model_construct(**row) for row in results[:limit]]
+            
+            next_cursor = encode_cursor(jobs[-1].start_time, jobs[-1].id) if has_more else None
             
             return PaginatedResponse(
                 items=jobs,
                 total=total,
                 skip=skip,
                 limit=limit,
-                has_more=(skip + limit) < total
+                has_more=has_more,
+                next_cursor=next_cursor
             )
             
         except Exception as e:
@@ -608,24 +879,28 @@ class ETLService:
             raise
     
     async def get_etl_status(self, db: DatabaseManager) -> Dict[str, Any]:
-        """Get current ETL system status"""
+        """Get current ETL system status, cached for STATUS_CACHE_TTL seconds"""
+        cached_at, cached = self._status_cache
+        if cached is not None and time.monotonic() - cached_at < STATUS_CACHE_TTL:
+            return cached
+        
         try:
             # Get recent job statistics
             status_sql = """
                 SELECT 
                     COUNT(*) as total_jobs,
-                    COUNT(CASE WHEN status = 'SUCCESS' THEN 1 END) as successful_jobs,
-                    COUNT(CASE WHEN status = 'FAILED' THEN 1 END) as failed_jobs,
-                    COUNT(CASE WHEN status = 'RUNNING' THEN 1 END) as running_jobs,
+                    COUNT(*) FILTER (WHERE status = 'SUCCESS') as successful_jobs,
+                    COUNT(*) FILTER (WHERE status = 'FAILED') as failed_jobs,
+                    COUNT(*) FILTER (WHERE status = 'RUNNING') as running_jobs,
                     MAX(start_time) as last_run
                 FROM etl_job_logs 
                 WHERE created_at >= NOW() - INTERVAL '7 days'
             """
             
-            result = db.execute_query(status_sql, fetch_one=True)
+            result = await run_prepared(db, status_sql, fetch_one=True)
             
             if result:
-                return {
+                status = {
                     'is_running': result['running_jobs'] > 0,
                     'last_run': result['last_run'].isoformat() if result['last_run'] else None,
                     'total_jobs': result['total_jobs'],
@@ -634,7 +909,7 @@ class ETLService:
                     'running_jobs': result['running_jobs']
                 }
             else:
-                return {
+                status = {
                     'is_running': False,
                     'last_run': None,
                     'total_jobs': 0,
@@ -642,6 +917,10 @@ class ETLService:
                     'failed_jobs': 0,
                     'running_jobs': 0
                 }
+            
+            # Errors are not cached, so the next poll retries the query
+            self._status_cache = (time.monotonic(), status)
+            return status
                 
         except Exception as e:
             logger.error(f"Failed to get ETL status: {e}")
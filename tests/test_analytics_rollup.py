@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the rollup-backed analytics endpoints
+
+get_stock_summary and get_market_overview read whole days from the
+price_daily_rollup view; these check them against plain per-bar arithmetic
+over the raw table, including days loaded after the last rollup refresh.
+Needs the PostgreSQL database from .env; skipped when it is unreachable.
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'api')]
+
+from alpha_vantage_intraday.DB import init_db
+from alpha_vantage_intraday.ETL import DataLoader, TransformResult
+from alpha_vantage_intraday.MODELS import Stock, StockPriceIntraday
+
+SYMBOLS = ("ZRLA", "ZRLB")
+INTERVAL = "5min"
+# Far from any real data, so the market overview sees only these symbols
+DAY0 = datetime(2031, 3, 3)
+START = DAY0 + timedelta(hours=12)
+END = DAY0 + timedelta(days=3, hours=10)
+
+@pytest.fixture(scope="module")
+def db():
+    try:
+        db_manager = init_db()
+    except Exception as e:
+        pytest.skip(f"database unavailable: {e}")
+
+    yield db_manager
+
+    db_manager.execute_query("DELETE FROM stocks WHERE symbol = ANY(%s)", (list(SYMBOLS),))
+    db_manager.refresh_price_rollup(force=True)
+
+def bars(symbol, day, count, seed):
+    """`count` 5min bars from 09:30 on `day`, with prices exact at DECIMAL(10,4)"""
+    records = []
+    for i in range(count):
+        close = round(100 + seed + ((i * 37 + seed * 11) % 23 - 11) * 0.0625, 4)
+        records.append(StockPriceIntraday(
+            stock_symbol=symbol,
+            timestamp=day + timedelta(hours=9, minutes=30 + 5 * i),
+            open_price=close - 0.25, high_price=close + 0.5, low_price=close - 0.75,
+            close_price=close, volume=1000 + 17 * i + seed, interval=INTERVAL
+        ))
+    return records
+
+def load(loader, symbol, records):
+    stock = Stock(symbol=symbol, company_name=f"{symbol} Test", exchange="TEST")
+    result = loader.load_transformed_data(TransformResult(
+        stock=stock, price_records=records, symbol=symbol, interval=INTERVAL,
+        record_count=len(records), transformation_timestamp=datetime.utcnow().isoformat(),
+        api_metadata={}
+    ))
+    assert result['success'], result
+
+def raw_bars(db, symbol):
+    return db.execute_query(
+        """
+        SELECT open_price, high_price, low_price, close_price, volume
+        FROM stock_prices_intraday
+        WHERE stock_symbol = %s AND interval = %s AND timestamp >= %s AND timestamp <= %s
+        ORDER BY timestamp
+        """,
+        (symbol, INTERVAL, START, END), fetch=True
+    )
+
+def expected_summary(rows):
+    """Summary figures computed bar by bar, as the endpoint originally did"""
+    prices = [float(row[col]) for row in rows for col in ('open_price', 'high_price', 'low_price', 'close_price')]
+    volumes = [row['volume'] for row in rows]
+    closes = [float(row['close_price']) for row in rows]
+    changes = [(closes[i] - closes[i - 1]) / closes[i - 1] * 100 for i in range(1, len(closes))]
+    avg_change = sum(changes) / len(changes)
+    return {
+        'total_records': len(rows),
+        'price_stats': {'min': min(prices), 'max': max(prices),
+                        'avg': sum(prices) / len(prices), 'latest': closes[-1]},
+        'volume_stats': {'min': min(volumes), 'max': max(volumes),
+                         'avg': sum(volumes) / len(volumes), 'total': sum(volumes)},
+        'volatility_stats': {
+            'avg_change': avg_change, 'max_gain': max(changes), 'max_loss': min(changes),
+            'volatility': (sum((c - avg_change) ** 2 for c in changes) / len(changes)) ** 0.5
+        }
+    }
+
+def assert_close(actual, expected):
+    if isinstance(expected, dict):
+        for key, value in expected.items():
+            assert_close(actual[key], value)
+    else:
+        assert float(actual) == pytest.approx(expected, rel=1e-9, abs=1e-6)
+
+def test_analytics_match_raw_bars_after_unrefreshed_loads(db):
+    from services import PriceService
+
+    loader = DataLoader(db)
+    for seed, symbol in enumerate(SYMBOLS):
+        for day in range(3):
+            load(loader, symbol, bars(symbol, DAY0 + timedelta(days=day), 40, seed + day))
+    loader.flush_job_logs()
+    assert db.refresh_price_rollup()
+    # Nothing written since, so a second refresh is skipped
+    assert not db.refresh_price_rollup()
+
+    # Rewrite a day the view already holds and add a new one, without refreshing;
+    # the summary range then spans fresh days, a stale day and partial edge days
+    for seed, symbol in enumerate(SYMBOLS):
+        load(loader, symbol, bars(symbol, DAY0 + timedelta(days=1), 60, seed + 7))
+        load(loader, symbol, bars(symbol, DAY0 + timedelta(days=3), 20, seed + 3))
+    loader.flush_job_logs()
+
+    service = PriceService()
+    for symbol in SYMBOLS:
+        summary = asyncio.run(service.get_stock_summary(db, symbol, START, END, INTERVAL))
+        assert_close(summary, expected_summary(raw_bars(db, symbol)))
+
+    overview = asyncio.run(service.get_market_overview(db, START, END, INTERVAL))
+    assert overview['total_price_records'] == sum(len(raw_bars(db, symbol)) for symbol in SYMBOLS)
+    for gainer in overview['top_gainers']:
+        rows = raw_bars(db, gainer['stock_symbol'])
+        expected = (max(float(r['close_price']) for r in rows) - min(float(r['open_price']) for r in rows)) \
+            / min(float(r['open_price']) for r in rows) * 100
+        assert_close(gainer['gain_percent'], expected)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Regression test for concurrent price loads
+
+Streaming, polling and load_multiple_stocks' worker threads can load the same
+bars at once; every writer must succeed, with the bars upserted exactly once.
+Needs the PostgreSQL database from .env; skipped when it is unreachable.
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from alpha_vantage_intraday.DB import init_db
+from alpha_vantage_intraday.ETL import DataLoader, TransformResult
+from alpha_vantage_intraday.MODELS import Stock, StockPriceIntraday
+
+SYMBOL = "ZCCL"
+INTERVAL = "5min"
+WRITERS = 4
+TRIALS = 10
+# Far from any real data
+DAY0 = datetime(2033, 6, 6, 9, 30)
+
+@pytest.fixture(scope="module")
+def db():
+    try:
+        db_manager = init_db()
+    except Exception as e:
+        pytest.skip(f"database unavailable: {e}")
+
+    yield db_manager
+
+    db_manager.execute_query("DELETE FROM stocks WHERE symbol = %s", (SYMBOL,))
+    db_manager.execute_query("DELETE FROM etl_job_logs WHERE job_name = %s", (f"intraday_etl_{SYMBOL}",))
+
+def transformed(start, count, writer):
+    """`count` bars from `start`, priced per writer so each one's upsert is a real update"""
+    records = [
+        StockPriceIntraday(
+            stock_symbol=SYMBOL, timestamp=start + timedelta(minutes=5 * i),
+            open_price=10 + writer, high_price=11 + writer, low_price=9 + writer,
+            close_price=10.5 + writer, volume=100 * (writer + 1), interval=INTERVAL
+        )
+        for i in range(count)
+    ]
+    return TransformResult(
+        stock=Stock(symbol=SYMBOL, company_name=f"{SYMBOL} Test", exchange="TEST"),
+        price_records=records, symbol=SYMBOL, interval=INTERVAL, record_count=count,
+        transformation_timestamp=datetime.utcnow().isoformat(), api_metadata={}
+    )
+
+def test_concurrent_loads_of_overlapping_bars_all_succeed(db):
+    loader = DataLoader(db)
+    failures = []
+
+    for trial in range(TRIALS):
+        # Each trial's writers start together on bars none of them has written yet,
+        # offset so every pair of writers overlaps
+        start = DAY0 + timedelta(days=trial)
+        batches = [transformed(start + timedelta(minutes=25 * writer), 60, writer) for writer in range(WRITERS)]
+        barrier = threading.Barrier(WRITERS)
+
+        def run(transformed_data):
+            barrier.wait()
+            result = loader.load_transformed_data(transformed_data)
+            if not result['success']:
+                failures.append(result)
+
+        threads = [threading.Thread(target=run, args=(batch,)) for batch in batches]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    loader.flush_job_logs()
+    assert failures == []
+
+    expected = len({record.timestamp for trial in range(TRIALS) for writer in range(WRITERS)
+                    for record in transformed(DAY0 + timedelta(days=trial, minutes=25 * writer), 60, writer).price_records})
+    row = db.execute_query(
+        "SELECT COUNT(*) FROM stock_prices_intraday WHERE stock_symbol = %s AND interval = %s",
+        (SYMBOL, INTERVAL), fetch_one=True
+    )
+    assert row['count'] == expected
@@ -9,12 +9,13 @@ import logging
 import signal
 import sys
 import os
+import types
 from datetime import datetime
 from typing import List, Dict, Optional, Any
 from dotenv import load_dotenv
 
 from alpha_vantage_intraday.DB import init_db
-from alpha_vantage_intraday.intraday_pipeline import ETLService
+from alpha_vantage_intraday.intraday_pipeline import ETLService, DEFAULT_SYMBOLS, run_sync
 from alpha_vantage_intraday.STREAM_N_POLLING import DataStreamingService, PollingManager
 
 # Load environment variables
@@ -32,23 +33,33 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Default symbols for a single cycle; streaming and polling use DEFAULT_SYMBOLS
+DEFAULT_SINGLE_CYCLE = ("AAPL", "MSFT", "GOOGL")
+
+# Runner configuration, read from the environment once at import
+_CFG = types.SimpleNamespace(
+    interval=os.getenv('DEFAULT_INTERVAL', '5min'),
+    polling=int(os.getenv('DEFAULT_POLLING_INTERVAL', '5')),
+    batch=int(os.getenv('BATCH_SIZE', '10'))
+)
+
 class ETLRunner:
     """ETL Pipeline Trigger for periodic intraday data processing and real-time streaming"""
     
     def __init__(self):
         self.is_running = False
-        self.etl_service = ETLService()
+        self.etl_service = ETLService.get()
         
-        # Load configuration from environment variables
-        self.default_interval = os.getenv('DEFAULT_INTERVAL', '5min')
-        self.default_polling_interval = int(os.getenv('DEFAULT_POLLING_INTERVAL', '5'))
-        self.batch_size = int(os.getenv('BATCH_SIZE', '10'))
+        self.default_interval = _CFG.interval
+        self.default_polling_interval = _CFG.polling
+        self.batch_size = _CFG.batch
         
         # Initialize streaming services
-        self.streaming_service = DataStreamingService()
-        self.polling_manager = PollingManager()
-        
-        # Signal handlers for graceful shutdown
+        self.streaming_service = DataStreamingService(self.etl_service)
+        self.polling_manager = PollingManager(self.etl_service)
+    
+    def install_signal_handlers(self):
+        """Register SIGINT/SIGTERM handlers for graceful shutdown (main thread only)"""
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
     
@@ -56,6 +67,7 @@ class ETLRunner:
         """Handle shutdown signals gracefully"""
         logger.info(f"Received signal {signum}, shutting down gracefully...")
         self.stop()
+        # Buffered job logs are written by main() once the exit has unwound
         sys.exit(0)
     
     def process_single_stock(self, symbol: str, interval: str = None) -> int:
@@ -72,12 +84,16 @@ class ETLRunner:
             return 0
     
     def process_batch_stocks(self, symbols: List[str], interval: str = None) -> Dict[str, int]:
+        """Process multiple stocks for intraday data (async callers: use aprocess_batch_stocks)"""
+        return run_sync(self.aprocess_batch_stocks(symbols, interval))
+    
+    async def aprocess_batch_stocks(self, symbols: List[str], interval: str = None) -> Dict[str, int]:
+        """Async process_batch_stocks, for use from inside a running event loop"""
         if interval is None:
             interval = self.default_interval
-        """Process multiple stocks for intraday data"""
         try:
             logger.info(f"Processing batch intraday data for {len(symbols)} stocks with {interval} interval")
-            results = self.etl_service.process_multiple_stocks_intraday(symbols, interval)
+            results = await self.etl_service.aprocess_multiple_stocks_intraday(symbols, interval)
             
             total_processed = sum(results.values())
             logger.info(f"Batch processing completed. Total records processed: {total_processed}")
@@ -117,7 +133,7 @@ class ETLRunner:
             interval = self.default_interval
         """Run a single ETL cycle"""
         if symbols is None:
-            symbols = ["AAPL", "MSFT", "GOOGL"]  # Default symbols for single cycle
+            symbols = DEFAULT_SINGLE_CYCLE
         
         logger.info(f"Running single ETL cycle for {len(symbols)} symbols")
         return self.process_batch_stocks(symbols, interval)
@@ -140,6 +156,14 @@ class ETLRunner:
             logger.error(f"Failed to get ETL status: {e}")
             return None
     
+    def run_maintenance(self):
+        """Create upcoming monthly partitions and refresh the analytics rollup (e.g. from cron)"""
+        self.etl_service.ensure_partitions(force=True)
+        try:
+            self.etl_service.db_manager.refresh_price_rollup()
+        except Exception as e:
+            logger.error(f"Maintenance failed: {e}")
+    
     def stop(self):
         """Stop the ETL runner"""
         self.is_running = False
@@ -152,7 +176,7 @@ class ETLRunner:
         """Start real-time data streaming"""
         try:
             if symbols is None:
-                symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]  # Default symbols for streaming
+                symbols = DEFAULT_SYMBOLS
             
             logger.info(f"Starting real-time data streaming for {len(symbols)} symbols every {interval_minutes} minutes")
             
@@ -209,7 +233,7 @@ class ETLRunner:
         """Start continuous polling with the polling manager"""
         try:
             if symbols is None:
-                symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]  # Default symbols for continuous polling
+                symbols = DEFAULT_SYMBOLS
             
             logger.info(f"Starting continuous polling for {len(symbols)} symbols every {interval_minutes} minutes")
             
@@ -219,8 +243,8 @@ class ETLRunner:
                 interval_minutes=interval_minutes,
                 max_iterations=max_iterations,
                 symbols=symbols,
-                interval="5min",
-                batch_size=10
+                interval=self.default_interval,
+                batch_size=self.batch_size
             )
             
             results = self.polling_manager.continuous_polling(config)
@@ -237,7 +261,7 @@ class ETLRunner:
         """Start market hours polling"""
         try:
             if symbols is None:
-                symbols = ["AAPL", "GOOGL", "MSFT", "AMZN", "TSLA"]  # Default symbols for market hours polling
+                symbols = DEFAULT_SYMBOLS
             
             logger.info(f"Starting market hours polling for {len(symbols)} symbols every {interval_minutes} minutes")
             
@@ -247,8 +271,8 @@ class ETLRunner:
                 interval_minutes=interval_minutes,
                 max_iterations=max_iterations,
                 symbols=symbols,
-                interval="5min",
-                batch_size=10
+                interval=self.default_interval,
+                batch_size=self.batch_size
             )
             
             results = self.polling_manager.market_hours_polling(config)
@@ -275,6 +299,8 @@ def main():
                        choices=['1min', '5min', '15min', '30min', '60min'],
                        help='Intraday interval (default: from environment or 5min)')
     parser.add_argument('--status', action='store_true', help='Show ETL system status')
+    parser.add_argument('--maintenance', action='store_true',
+                       help='Create upcoming monthly partitions and refresh the analytics rollup')
     # --poll and --poll-interval removed - replaced by streaming functionality
     parser.add_argument('--cycle', action='store_true', help='Run a single ETL cycle')
     parser.add_argument('--pipeline', action='store_true', help='Run complete ETL pipeline with detailed stats')
@@ -299,6 +325,7 @@ def main():
     
     args = parser.parse_args()
     
+    runner = None
     try:
         if args.init_db:
             logger.info("Initializing database...")
@@ -307,6 +334,7 @@ def main():
             return
         
         runner = ETLRunner()
+        runner.install_signal_handlers()
         
         if args.single:
             runner.process_single_stock(args.single, args.interval)
@@ -325,6 +353,10 @@ def main():
             runner.show_status()
             return
         
+        if args.maintenance:
+            runner.run_maintenance()
+            return
+        
         if args.cycle:
             runner.run_single_cycle(interval=args.interval)
             return
@@ -335,6 +367,7 @@ def main():
         if args.stream:
             stream_interval = args.stream_interval or runner.default_polling_interval
             logger.info(f"Starting real-time data streaming every {stream_interval} minutes...")
+            runner.streaming_service.install_signal_handlers()
             runner.start_streaming(
                 interval_minutes=stream_interval,
                 max_iterations=args.stream_max_iterations
@@ -390,6 +423,11 @@ def main():
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         sys.exit(1)
+    finally:
+        # Job logs are buffered; write whatever is pending, on every exit path
+        # including signals, after any open transaction has been rolled back
+        if runner is not None:
+            runner.etl_service.flush_job_logs()
 
 if __name__ == "__main__":
     main()